@@ -0,0 +1 @@
+"""Offline benchmarks of the 50five integration."""
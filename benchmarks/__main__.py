@@ -0,0 +1,286 @@
+"""
+Offline benchmarks of the 50five integration.
+
+Runs the real integration inside a test Home Assistant instance against the
+local fake cloud, e.g.:
+
+    scripts/benchmark poll --chargers 1 100 1000 --charging 3
+    scripts/benchmark startup --chargers 500
+    scripts/benchmark poll --chargers 100 --charging 3 --record traffic.jsonl.gz
+    scripts/benchmark replay traffic.jsonl.gz --speed 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+from contextlib import asynccontextmanager, contextmanager
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+from fiftyfive import Api, CustomerType, Market
+from homeassistant import loader
+from homeassistant.const import CONF_COUNTRY, CONF_PASSWORD, CONF_USERNAME
+from homeassistant.helpers.entity import Entity
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from custom_components.fiftyfive.const import (
+    CONF_CALL_BUDGET,
+    CONF_CUST_TYPE,
+    CONF_RECORD_TRAFFIC,
+    DEFAULT_CALL_BUDGET,
+    DOMAIN,
+)
+from custom_components.fiftyfive.replay import ReplayApi
+from custom_components.fiftyfive.session import async_get_http
+
+from .fake_cloud import FakeCloud
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator, Callable, Generator
+
+    from homeassistant.core import HomeAssistant
+
+# The poll benchmark refreshes back to back instead of at the polling interval
+UNLIMITED_BUDGET = 10**9
+
+
+@contextmanager
+def count_state_writes() -> Generator[list[int]]:
+    """Count the entity state writes while active."""
+    counter = [0]
+    write = Entity.async_write_ha_state
+
+    def counting_write(entity: Entity) -> None:
+        counter[0] += 1
+        write(entity)
+
+    with patch.object(Entity, "async_write_ha_state", counting_write):
+        yield counter
+
+
+def cloud_api(cloud: FakeCloud) -> Callable[..., Api]:
+    """Return a factory of Api instances talking to the fake cloud."""
+
+    def local_api(**kwargs: Any) -> Api:
+        api = Api(**kwargs)
+        api.url = cloud.url
+        api.api = f"{cloud.url}/api/ajax"
+        return api
+
+    return local_api
+
+
+@asynccontextmanager
+async def integration(
+    api: Callable[..., Any],
+    config_dir: str,
+    budget: int | None = None,
+    *,
+    record: bool = False,
+) -> AsyncGenerator[tuple[HomeAssistant, MockConfigEntry]]:
+    """
+    Run a Home Assistant instance with the integration set up against an API.
+
+    Without a call budget, the integration keeps to its default budget.
+    """
+    async with async_test_home_assistant(config_dir=config_dir) as hass:
+        hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            version=2,
+            entry_id="benchmark",
+            unique_id="benchmark",
+            data={
+                CONF_USERNAME: "benchmark@example.com",
+                CONF_PASSWORD: "benchmark",
+                CONF_COUNTRY: Market.NONE,
+                CONF_CUST_TYPE: CustomerType.FIFTYFIVE,
+            },
+            options={
+                CONF_CALL_BUDGET: budget or DEFAULT_CALL_BUDGET,
+                CONF_RECORD_TRAFFIC: record,
+            },
+        )
+        entry.add_to_hass(hass)
+        with patch("custom_components.fiftyfive.api.Api", api):
+            try:
+                yield hass, entry
+            finally:
+                await hass.async_stop(force=True)
+
+
+async def setup_entry(hass: HomeAssistant, entry: MockConfigEntry) -> float:
+    """Set up the entry and return how long it took, until entities exist."""
+    start = time.perf_counter()
+    await hass.config_entries.async_setup(entry.entry_id)
+    elapsed = time.perf_counter() - start
+    # Also wait for the first refresh when it runs in the background
+    await hass.async_block_till_done(wait_background_tasks=True)
+    return elapsed
+
+
+async def bench_poll(args: argparse.Namespace) -> None:
+    """Measure refresh cycles against fleet size."""
+    print(
+        f"{'chargers':>8} {'setup s':>8} {'poll ms':>8} {'p95 ms':>8} "
+        f"{'calls':>7} {'http':>5} {'conns':>5} {'writes':>7} {'cpu ms':>8} "
+        f"{'peak MiB':>9}"
+    )
+    if args.record and len(args.chargers) > 1:
+        msg = "--record takes a single fleet size"
+        raise SystemExit(msg)
+    for chargers in args.chargers:
+        cloud = FakeCloud(
+            chargers=chargers,
+            charging=min(args.charging, chargers),
+            latency=args.latency,
+            error_rate=args.error_rate,
+        )
+        await cloud.start()
+        with tempfile.TemporaryDirectory() as config_dir:
+            async with integration(
+                cloud_api(cloud),
+                config_dir,
+                args.budget or UNLIMITED_BUDGET,
+                record=bool(args.record),
+            ) as (hass, entry):
+                setup = await setup_entry(hass, entry)
+                coordinator = entry.runtime_data.coordinator
+                connections = async_get_http(hass).stats
+
+                latencies, cpu, calls, http, conns, writes = [], [], [], [], [], []
+                tracemalloc.start()
+                for _ in range(args.cycles):
+                    cloud.reset_counters()
+                    created = connections.created
+                    with count_state_writes() as written:
+                        cpu_start = time.process_time()
+                        start = time.perf_counter()
+                        await coordinator.async_refresh()
+                        await hass.async_block_till_done()
+                        latencies.append(time.perf_counter() - start)
+                        cpu.append(time.process_time() - cpu_start)
+                    calls.append(cloud.calls.total())
+                    http.append(cloud.http_requests)
+                    conns.append(connections.created - created)
+                    writes.append(written[0])
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            # Stopping the instance flushed the recording to the config dir
+            if args.record:
+                shutil.copyfile(
+                    f"{config_dir}/{DOMAIN}_traffic_{entry.entry_id}.jsonl.gz",
+                    args.record,
+                )
+        await cloud.stop()
+
+        print(
+            f"{chargers:>8} {setup:>8.2f} "
+            f"{1000 * statistics.mean(latencies):>8.1f} "
+            f"{1000 * _p95(latencies):>8.1f} "
+            f"{statistics.mean(calls):>7.1f} {statistics.mean(http):>5.1f} "
+            f"{statistics.mean(conns):>5.1f} {statistics.mean(writes):>7.1f} "
+            f"{1000 * statistics.mean(cpu):>8.1f} "
+            f"{peak / 2**20:>9.1f}"
+        )
+
+
+async def bench_startup(args: argparse.Namespace) -> None:
+    """Compare setup time without and with a persisted data snapshot."""
+    print(f"{'chargers':>8} {'cold s':>8} {'warm s':>8}")
+    for chargers in args.chargers:
+        cloud = FakeCloud(chargers=chargers, latency=args.latency)
+        await cloud.start()
+        with tempfile.TemporaryDirectory() as config_dir:
+            # Stopping the first instance writes the snapshot to the config dir
+            api = cloud_api(cloud)
+            async with integration(api, config_dir, args.budget) as (hass, entry):
+                cold = await setup_entry(hass, entry)
+            async with integration(api, config_dir, args.budget) as (hass, entry):
+                warm = await setup_entry(hass, entry)
+        await cloud.stop()
+        print(f"{chargers:>8} {cold:>8.2f} {warm:>8.2f}")
+
+
+async def bench_replay(args: argparse.Namespace) -> None:
+    """
+    Replay a recording of API traffic through the coordinator and platforms.
+
+    Refreshes back to back until the recording is used up, the replayed
+    responses arriving `--speed` times faster than they were recorded.
+    """
+    replay = ReplayApi.load(args.recording, args.speed)
+    with tempfile.TemporaryDirectory() as config_dir:
+        async with integration(lambda **_: replay, config_dir, args.budget) as (
+            hass,
+            entry,
+        ):
+            tracemalloc.start()
+            cpu_start = time.process_time()
+            start = time.perf_counter()
+            with count_state_writes() as written:
+                await setup_entry(hass, entry)
+                coordinator = entry.runtime_data.coordinator
+                refreshes = 0
+                while not replay.finished:
+                    await coordinator.async_refresh()
+                    await hass.async_block_till_done()
+                    refreshes += 1
+            elapsed = time.perf_counter() - start
+            cpu = time.process_time() - cpu_start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+    print(
+        f"{'refreshes':>9} {'recorded s':>10} {'replay s':>9} {'calls':>7} "
+        f"{'writes':>7} {'cpu s':>7} {'peak MiB':>9}"
+    )
+    print(
+        f"{refreshes:>9} {replay.duration:>10.1f} {elapsed:>9.2f} "
+        f"{replay.calls:>7} {written[0]:>7} {cpu:>7.2f} {peak / 2**20:>9.1f}"
+    )
+
+
+def _p95(values: list[float]) -> float:
+    """Return the 95th percentile of some values."""
+    if len(values) < 2:  # noqa: PLR2004
+        return values[0]
+    return statistics.quantiles(values, n=20)[-1]
+
+
+def main() -> None:
+    """Run a benchmark."""
+    parser = argparse.ArgumentParser(prog="scripts/benchmark")
+    parser.add_argument("benchmark", choices=("poll", "startup", "replay"))
+    parser.add_argument("recording", nargs="?", help="Recording to replay")
+    parser.add_argument(
+        "--chargers", type=int, nargs="+", default=[1, 10, 100, 1000, 5000]
+    )
+    parser.add_argument("--charging", type=int, default=0)
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--budget", type=int, help="API calls per hour")
+    parser.add_argument("--record", help="Record the API traffic of poll to a file")
+    parser.add_argument(
+        "--speed", type=float, default=100, help="Replay speed, 0 for no waits"
+    )
+    args = parser.parse_args()
+    if args.benchmark == "replay" and not args.recording:
+        parser.error("replay needs a recording")
+
+    bench = {"poll": bench_poll, "startup": bench_startup, "replay": bench_replay}
+    asyncio.run(bench[args.benchmark](args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Local stand-in for the 50five cloud, serving a fake fleet of chargers."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiohttp import web
+
+SESSION_COOKIE = "PHPSESSID"
+
+
+@dataclass
+class FakeCharger:
+    """State of one fake charger."""
+
+    idx: str
+    charging: bool = False
+    energy_kwh: float = 0.0
+    minutes: int = 0
+    blocked: bool = False
+
+    def network(self) -> dict[str, Any]:
+        """Return the charger as listed by NetworkOverview."""
+        return {
+            "IDX": self.idx,
+            "NAME": f"Charger {self.idx}",
+            "SOFTWARE_VERSION": "1.0.0",
+            "CONNECTOR": "Type 2",
+            "STATUS": "1" if self.charging else "0",
+        }
+
+    def overview(self) -> dict[str, Any]:
+        """Return the charger as detailed by Overview, advancing its session."""
+        if self.charging:
+            self.energy_kwh = round(self.energy_kwh + random.uniform(0, 0.1), 3)
+            self.minutes += 1
+        return {
+            "STATUS": "1" if self.charging else "0",
+            "MOM_POWER_KW": round(random.uniform(6, 11), 2) if self.charging else 0,
+            "TRANS_ENERGY_DELIVERED_KWH": self.energy_kwh if self.charging else 0,
+            "TRANSACTION_TIME_H_M": (
+                f"{self.minutes // 60}:{self.minutes % 60:02d}" if self.charging else ""
+            ),
+            "CARDID": "04AABBCCDD" if self.charging else None,
+            "NOTIFICATION": "Blocked" if self.blocked else "Available",
+        }
+
+
+@dataclass
+class FakeCloud:
+    """
+    aiohttp application mimicking the 50five endpoints used by the integration.
+
+    Latency is added to every API call and `error_rate` of them fail with a 503.
+    """
+
+    chargers: int = 10
+    charging: int = 0
+    latency: float = 0.0
+    error_rate: float = 0.0
+    cards: tuple[str, ...] = ("04AABBCCDD",)
+
+    fleet: dict[str, FakeCharger] = field(init=False)
+    # Number of API calls, by method, since the last reset
+    calls: Counter[str] = field(default_factory=Counter, init=False)
+    http_requests: int = field(default=0, init=False)
+    url: str = field(default="", init=False)
+    _runner: web.AppRunner | None = field(default=None, init=False)
+
+    def __post_init__(self) -> None:
+        """Build the fleet."""
+        self.fleet = {
+            idx: FakeCharger(idx=idx, charging=i < self.charging)
+            for i, idx in enumerate(f"{100000 + i}" for i in range(self.chargers))
+        }
+
+    def reset_counters(self) -> None:
+        """Reset the call counters."""
+        self.calls.clear()
+        self.http_requests = 0
+
+    async def start(self) -> str:
+        """Start serving on a free local port and return the base url."""
+        app = web.Application()
+        app.router.add_post("/Login/Login", self._login)
+        app.router.add_get("/Logout", self._logout)
+        app.router.add_get("/api/ajax", self._api)
+        # Overview fan-outs of large fleets make for very long request lines
+        self._runner = web.AppRunner(app, access_log=None, max_line_size=2**24)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "localhost", 0).start()
+        self.url = f"http://localhost:{self._runner.addresses[0][1]}"
+        return self.url
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def _login(self, _: web.Request) -> web.Response:
+        self.http_requests += 1
+        self.calls["login"] += 1
+        response = web.Response(status=302, headers={"Location": "/"})
+        response.set_cookie(SESSION_COOKIE, "fake-session")
+        return response
+
+    async def _logout(self, _: web.Request) -> web.Response:
+        response = web.Response()
+        response.del_cookie(SESSION_COOKIE)
+        return response
+
+    async def _api(self, request: web.Request) -> web.Response:
+        self.http_requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if random.random() < self.error_rate:
+            return web.Response(status=503, text="Service unavailable")
+
+        calls = json.loads(request.query["requests"])
+        results = [self._handle(calls[str(i)]) for i in range(len(calls))]
+        return web.Response(text=json.dumps(results), content_type="text/html")
+
+    def _handle(self, call: dict[str, Any]) -> Any:
+        method, params = call["method"], call["params"]
+        self.calls[method] += 1
+        if method == "networkOverview":
+            return [charger.network() for charger in self.fleet.values()]
+        charger = self.fleet[params["rechargeSpotId"]]
+        if method == "overview":
+            return [charger.overview()]
+        if method == "userAccess":
+            return [{"id": "customer-1"}]
+        if method == "cardAccess":
+            return [{"text": card} for card in self.cards]
+        if method == "action":
+            return self._action(charger, params)
+        msg = f"Unknown method {method}"
+        raise web.HTTPBadRequest(text=msg)
+
+    def _action(self, charger: FakeCharger, params: dict[str, Any]) -> Any:
+        action = params["action"]
+        if action == "StartTransaction":
+            if params["card"] not in self.cards:
+                return []
+            charger.charging = True
+        elif action == "StopTransaction":
+            charger.charging, charger.energy_kwh, charger.minutes = False, 0.0, 0
+        elif action in ("Block", "Unblock"):
+            charger.blocked = action == "Block"
+        return [{"result": "OK"}]
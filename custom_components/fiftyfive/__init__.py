@@ -7,20 +7,46 @@ https://github.com/Crazy-Duck/home-assistant-fiftyfive
 
 from __future__ import annotations
 
+from functools import partial
 from typing import TYPE_CHECKING
 
-from homeassistant.const import CONF_COUNTRY, CONF_PASSWORD, CONF_USERNAME, Platform
+from homeassistant.const import (
+    CONF_COUNTRY,
+    CONF_PASSWORD,
+    CONF_USERNAME,
+    EVENT_HOMEASSISTANT_STOP,
+    Platform,
+)
+from homeassistant.core import SupportsResponse, callback
 from homeassistant.helpers import config_validation as cv
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.storage import Store
 from homeassistant.loader import async_get_loaded_integration
 
 from fiftyfive import CustomerType
 
 from .api import FiftyfiveApiClient
-from .const import CONF_CUST_TYPE, DEFAULT_UPDATE_INTERVAL, DOMAIN, LOGGER
-from .coordinator import FiftyfiveDataUpdateCoordinator
+from .const import (
+    CONF_CALL_BUDGET,
+    CONF_CUST_TYPE,
+    CONF_RECORD_TRAFFIC,
+    DEFAULT_CALL_BUDGET,
+    DOMAIN,
+    LOGGER,
+    STORAGE_VERSION,
+)
+from .coordinator import (
+    REFRESH_CONTEXT,
+    FiftyfiveDataUpdateCoordinator,
+    snapshot_key,
+)
 from .data import FiftyfiveData
-from .service_handler import ChargerServiceHandler
+from .outbox import CommandOutbox, outbox_key
+from .replay import TrafficRecorder
+from .scheduler import DATA_SCHEDULER, PollScheduler
+from .service_handler import DATA_SERVICE_HANDLER, ChargerServiceHandler
+from .session import async_get_http
+from .websocket import async_setup as async_setup_websocket
 
 if TYPE_CHECKING:
     from homeassistant.config_entries import ConfigEntry
@@ -57,19 +83,29 @@ async def async_migrate_entry(hass: HomeAssistant, config_entry: ConfigEntry) ->
 
 async def async_setup(hass: HomeAssistant, _: ConfigType) -> bool:
     """Set up the integration (global)."""
-    handler = ChargerServiceHandler(hass=hass)
-
-    hass.services.async_register(DOMAIN, "start_charge_session", handler.handle_start)
-    hass.services.async_register(DOMAIN, "stop_charge_session", handler.handle_stop)
-    hass.services.async_register(
-        DOMAIN, "soft_reset_charger", handler.handle_soft_reset
-    )
-    hass.services.async_register(
-        DOMAIN, "hard_reset_charger", handler.handle_hard_reset
+    hass.data[DATA_SCHEDULER] = PollScheduler(hass)
+    async_setup_websocket(hass)
+    handler = hass.data[DATA_SERVICE_HANDLER] = ChargerServiceHandler(hass=hass)
+    hass.bus.async_listen(
+        dr.EVENT_DEVICE_REGISTRY_UPDATED, handler.async_device_updated
     )
-    hass.services.async_register(DOMAIN, "unlock_connector", handler.handle_unlock)
-    hass.services.async_register(DOMAIN, "block_charger", handler.handle_block)
-    hass.services.async_register(DOMAIN, "unblock_charger", handler.handle_unblock)
+
+    for service, service_func in (
+        ("start_charge_session", handler.handle_start),
+        ("stop_charge_session", handler.handle_stop),
+        ("soft_reset_charger", handler.handle_soft_reset),
+        ("hard_reset_charger", handler.handle_hard_reset),
+        ("unlock_connector", handler.handle_unlock),
+        ("block_charger", handler.handle_block),
+        ("unblock_charger", handler.handle_unblock),
+        ("refresh_charger", handler.handle_refresh),
+    ):
+        hass.services.async_register(
+            DOMAIN,
+            service,
+            service_func,
+            supports_response=SupportsResponse.OPTIONAL,
+        )
 
     return True
 
@@ -80,14 +116,11 @@ async def async_setup_entry(
     entry: FiftyfiveConfigEntry,
 ) -> bool:
     """Set up this integration using UI."""
-    coordinator = FiftyfiveDataUpdateCoordinator(
-        hass=hass,
-        logger=LOGGER,
-        name=DOMAIN,
-        update_interval=DEFAULT_UPDATE_INTERVAL,
-    )
-    # Brittle but less mess than overriding __init__
-    coordinator.fast_polling_until = 0
+    scheduler = hass.data[DATA_SCHEDULER]
+    entry.async_on_unload(scheduler.async_register(entry.entry_id))
+    coordinator = FiftyfiveDataUpdateCoordinator(hass=hass, config_entry=entry)
+    session = async_get_http(hass).async_create_session()
+    entry.async_on_unload(session.close)
 
     entry.runtime_data = FiftyfiveData(
         client=FiftyfiveApiClient(
@@ -95,20 +128,100 @@ async def async_setup_entry(
             password=entry.data[CONF_PASSWORD],
             market=entry.data[CONF_COUNTRY],
             customer_type=entry.data[CONF_CUST_TYPE],
-            session=async_get_clientsession(hass),
+            session=session,
+            calls_per_hour=int(
+                entry.options.get(CONF_CALL_BUDGET, DEFAULT_CALL_BUDGET)
+            ),
         ),
         integration=async_get_loaded_integration(hass, entry.domain),
         coordinator=coordinator,
+        outbox=CommandOutbox(hass, entry),
     )
+    entry.runtime_data.client.slot = partial(scheduler.async_slot, entry.entry_id)
 
-    await coordinator.async_config_entry_first_refresh()
+    if entry.options.get(CONF_RECORD_TRAFFIC):
+        recorder = TrafficRecorder(
+            hass, hass.config.path(f"{DOMAIN}_traffic_{entry.entry_id}.jsonl.gz")
+        )
+        entry.runtime_data.client.recorder = recorder
+        entry.async_on_unload(recorder.async_flush)
+        entry.async_on_unload(
+            hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, recorder.async_flush)
+        )
+
+    # With a snapshot of the last good data, entities are set up from it right
+    # away and the first live refresh doesn't hold up startup
+    restored = await coordinator.async_restore_snapshot()
+    if not restored:
+        await coordinator.async_config_entry_first_refresh()
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    entry.async_on_unload(hass.data[DATA_SERVICE_HANDLER].async_track_entry(entry))
+    _async_remove_stale_devices(hass, entry)
+
+    # Commands queued before a restart are sent once the chargers are known
+    await entry.runtime_data.outbox.async_load()
+    entry.runtime_data.outbox.async_start()
+
+    if restored:
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh"
+        )
 
     return True
 
 
+@callback
+def _async_remove_stale_devices(
+    hass: HomeAssistant, entry: FiftyfiveConfigEntry
+) -> None:
+    """Remove the devices of chargers no longer on the account, as they go."""
+    coordinator = entry.runtime_data.coordinator
+    device_registry = dr.async_get(hass)
+    known: set[str] = set()
+
+    @callback
+    def _async_remove() -> None:
+        chargers = coordinator.data.keys()
+        if chargers == known:
+            return
+        known.clear()
+        known.update(chargers)
+        for device in dr.async_entries_for_config_entry(
+            device_registry, entry.entry_id
+        ):
+            if not any(
+                identifier[0] == DOMAIN and identifier[1] in (entry.entry_id, *known)
+                for identifier in device.identifiers
+            ):
+                LOGGER.info("Removing charger %s, gone from the account", device.name)
+                device_registry.async_update_device(
+                    device.id, remove_config_entry_id=entry.entry_id
+                )
+
+    _async_remove()
+    entry.async_on_unload(
+        coordinator.async_add_listener(_async_remove, context=REFRESH_CONTEXT)
+    )
+
+
+async def async_remove_config_entry_device(
+    hass: HomeAssistant,  # noqa: ARG001 Unused function argument: `hass`
+    entry: FiftyfiveConfigEntry,
+    device: dr.DeviceEntry,
+) -> bool:
+    """Allow removing the device of a charger that is gone from the account."""
+    return not any(
+        identifier[0] == DOMAIN
+        and (
+            identifier[1] == entry.entry_id
+            or identifier[1] in entry.runtime_data.coordinator.data
+        )
+        for identifier in device.identifiers
+    )
+
+
 async def async_unload_entry(
     hass: HomeAssistant,
     entry: FiftyfiveConfigEntry,
@@ -117,6 +230,15 @@ async def async_unload_entry(
     return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
 
+async def async_remove_entry(
+    hass: HomeAssistant,
+    entry: FiftyfiveConfigEntry,
+) -> None:
+    """Remove the data snapshot and outbox of a removed entry."""
+    await Store(hass, STORAGE_VERSION, snapshot_key(entry.entry_id)).async_remove()
+    await Store(hass, STORAGE_VERSION, outbox_key(entry.entry_id)).async_remove()
+
+
 async def async_reload_entry(
     hass: HomeAssistant,
     entry: FiftyfiveConfigEntry,
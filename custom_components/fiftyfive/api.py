@@ -2,8 +2,16 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections import defaultdict
+from contextlib import nullcontext
+from functools import partial
+from json import dumps
+from time import monotonic
 from typing import TYPE_CHECKING, Any
 
+import aiohttp
+
 from fiftyfive import (
     Api,
     Block,
@@ -22,8 +30,28 @@ from fiftyfive import (
     UnlockConnector,
 )
 
+from .breaker import CircuitBreaker
+from .budget import CallBudget
+from .const import (
+    BUDGET_MAX_WAIT,
+    CARD_CACHE_TTL,
+    COMMAND_BATCH_WINDOW,
+    DEFAULT_CALL_BUDGET,
+    OVERVIEW_CHUNK_SIZE,
+    OVERVIEW_CHUNK_TIMEOUT,
+    OVERVIEW_CONCURRENCY,
+)
+from .metrics import ApiMetrics
+
 if TYPE_CHECKING:
-    from aiohttp import ClientSession
+    from collections.abc import AsyncGenerator, Callable, Coroutine, Iterable
+    from contextlib import AbstractAsyncContextManager
+
+    from fiftyfive import Action, Request
+
+    from .replay import TrafficRecorder
+
+SESSION_COOKIE = "PHPSESSID"
 
 
 class FiftyfiveApiClientError(Exception):
@@ -36,6 +64,18 @@ class FiftyfiveApiClientCommunicationError(
     """Exception to indicate a communication error."""
 
 
+class FiftyfiveApiNotSentError(
+    FiftyfiveApiClientCommunicationError,
+):
+    """Exception to indicate a request failed before it reached 50five."""
+
+
+class FiftyfiveApiCircuitOpenError(
+    FiftyfiveApiNotSentError,
+):
+    """Exception to indicate calls are refused after repeated communication errors."""
+
+
 class FiftyfiveApiClientAuthenticationError(
     FiftyfiveApiClientError,
 ):
@@ -51,13 +91,14 @@ class FiftyfiveApiInvalidCardError(
 class FiftyfiveApiClient:
     """Sample API Client."""
 
-    def __init__(
+    def __init__(  # noqa: PLR0913 Too many arguments in function definition
         self,
         username: str,
         password: str,
         market: Market,
         customer_type: CustomerType,
-        session: ClientSession,
+        session: aiohttp.ClientSession,
+        calls_per_hour: int = DEFAULT_CALL_BUDGET,
     ) -> None:
         """Sample API Client."""
         self._api = Api(
@@ -67,78 +108,436 @@ class FiftyfiveApiClient:
             market=market,
             customer_type=customer_type,
         )
+        # Per charger: (expiry, card text -> customer id)
+        self._card_index: dict[str, tuple[float, dict[str, str]]] = {}
+        self.card_cache_hits = 0
+        self.card_cache_misses = 0
+        # Commands waiting to be sent in the next batch
+        self._pending: list[tuple[Action, asyncio.Future]] = []
+        self._flush_task: asyncio.Task | None = None
+        # Requests and commands in flight, shared by concurrent callers
+        self._in_flight: dict[str, asyncio.Task] = {}
+        # Commands for one charger are sent one after the other
+        self._charger_locks: defaultdict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self.metrics = ApiMetrics()
+        self.budget = CallBudget(calls_per_hour)
+        self.breaker = CircuitBreaker()
+        # Records the API traffic when set
+        self.recorder: TrafficRecorder | None = None
+        # Refresh slot held while background requests are sent, when set
+        self.slot: Callable[[], AbstractAsyncContextManager[None]] | None = None
+
+    async def _async_request(  # noqa: PLR0913 Too many arguments in function definition
+        self,
+        kind: str,
+        requests: list[Request],
+        *,
+        background: bool = False,
+        paced: bool = False,
+        timeout: float | None = None,  # noqa: ASYNC109 Excludes waiting for the budget
+        attempt: object | None = None,
+    ) -> Any:
+        """
+        Send a batch of requests of one kind, recording its metrics.
 
-    async def async_get_data(self) -> Any:
-        """Get data from the API."""
-        networks = await self._api.make_requests([NetworkOverview()])
+        Background requests wait for the call budget to allow them, up to
+        BUDGET_MAX_WAIT, unless their caller paces them, and then for the
+        refresh slot. Others are sent right away. While the circuit breaker
+        is open, requests fail without being sent. Requests of the same attempt
+        count once. The timeout doesn't include waiting for the budget or the
+        slot.
+        """
+        if not self.breaker.allow_request():
+            msg = f"50five is unreachable, retrying in {self.breaker.retry_in:.0f}s"
+            raise FiftyfiveApiCircuitOpenError(msg)
+        try:
+            if background and not paced:
+                await self._async_wait_for_budget(len(requests))
+            # Before awaiting anything else, so concurrent requests see the
+            # tokens gone
+            self.budget.consume(len(requests))
+            async with (
+                self.slot() if background and self.slot else nullcontext(),
+                asyncio.timeout(timeout),
+            ):
+                responses = await self._async_send(kind, requests)
+        except (aiohttp.ClientError, TimeoutError, ValueError) as exception:
+            self.breaker.record_failure(attempt)
+            # The error itself would log the whole, very long, request url
+            msg = f"Error communicating with 50five: {type(exception).__name__}"
+            if isinstance(
+                exception, aiohttp.ClientConnectorError | aiohttp.ConnectionTimeoutError
+            ):
+                # No connection, so nothing reached 50five
+                raise FiftyfiveApiNotSentError(msg) from exception
+            raise FiftyfiveApiClientCommunicationError(msg) from exception
+        finally:
+            self.breaker.release()
+        self.breaker.record_success()
+        return responses
+
+    async def _async_wait_for_budget(self, calls: int) -> None:
+        """
+        Wait for the call budget to allow some calls, up to BUDGET_MAX_WAIT.
+
+        The budget is checked again after every wait, as concurrent requests
+        may have taken the tokens in the meantime. The caller takes the tokens
+        without awaiting anything in between.
+        """
+        deadline = monotonic() + BUDGET_MAX_WAIT.total_seconds()
+        while (delay := min(self.budget.delay(calls), deadline - monotonic())) > 0:
+            self.budget.waited += delay
+            await asyncio.sleep(delay)
+
+    async def _async_send(self, kind: str, requests: list[Request]) -> Any:
+        """Send a batch of requests, logging in first if needed."""
+        if not any(c.key == SESSION_COOKIE for c in self._api.session.cookie_jar):
+            # Log in beforehand rather than inside make_requests, to time it apart
+            self.budget.consume(1)
+            with self.metrics.measure("login"):
+                if not await self._api.login():
+                    self.metrics.errors["login"] += 1
+
+        with self.metrics.measure(kind, len(requests)):
+            call = self._api.make_requests(requests)
+            if self.recorder is None:
+                responses = await call
+            else:
+                responses = await self.recorder.async_record(kind, requests, call)
+        # Approximated from the decoded response, the raw body isn't exposed
+        self.metrics.bytes_received += len(dumps(responses))
+        return responses
+
+    async def _async_single_flight[T](
+        self, key: str, factory: Callable[[], Coroutine[Any, Any, T]]
+    ) -> T:
+        """Run a call, or join the identical call that is already in flight."""
+        if (task := self._in_flight.get(key)) is None:
+            task = asyncio.create_task(factory())
+            self._in_flight[key] = task
+
+            def _done(_: asyncio.Task) -> None:
+                if self._in_flight.get(key) is task:
+                    del self._in_flight[key]
+                # All callers may have been cancelled, don't leave errors unretrieved
+                if not task.cancelled():
+                    task.exception()
+
+            task.add_done_callback(_done)
+        return await asyncio.shield(task)
+
+    async def async_get_networks(self) -> list[dict]:
+        """Get the chargers of the account."""
+        return await self._async_single_flight("networks", self._async_fetch_networks)
+
+    async def _async_fetch_networks(self) -> list[dict]:
+        networks = await self._async_request(
+            "networks", [NetworkOverview()], background=True
+        )
         if not networks:
             msg = "Invalid credentials"
             raise FiftyfiveApiClientAuthenticationError(msg)
+        return networks[0]
+
+    async def async_get_overviews(self, chargers: list[str]) -> dict[str, dict]:
+        """
+        Get the overview of the given chargers.
+
+        Chargers whose chunk failed are left out, see async_iter_overviews.
+        """
+        return {
+            charger: detail
+            async for details in self.async_iter_overviews(chargers)
+            for charger, detail in details.items()
+        }
+
+    async def async_iter_overviews(
+        self, chargers: list[str], *, paced: bool = False
+    ) -> AsyncGenerator[dict[str, dict]]:
+        """
+        Get the overview of the given chargers, yielding them chunk by chunk.
+
+        Up to OVERVIEW_CONCURRENCY chunks of OVERVIEW_CHUNK_SIZE chargers are in
+        flight at once, and chunks are yielded as they arrive. A chunk that
+        fails or takes longer than OVERVIEW_CHUNK_TIMEOUT is left out; only when
+        every chunk failed, or on an authentication error, an error is raised.
+        Chunks wait for the call budget, unless the caller paces them. They
+        are one attempt to the circuit breaker, so a refresh that fails counts
+        as one failure however many chunks it has.
+        """
+        semaphore = asyncio.Semaphore(OVERVIEW_CONCURRENCY)
+        attempt = object()
 
-        details = await self._api.make_requests(
-            [Overview(network["IDX"]) for network in networks[0]]
+        async def fetch(chunk: list[str]) -> dict[str, dict]:
+            async with semaphore:
+                return await self._async_single_flight(
+                    f"overviews:{','.join(chunk)}",
+                    partial(
+                        self._async_fetch_overviews,
+                        chunk,
+                        paced=paced,
+                        attempt=attempt,
+                    ),
+                )
+
+        tasks = [
+            asyncio.create_task(fetch(chargers[start : start + OVERVIEW_CHUNK_SIZE]))
+            for start in range(0, len(chargers), OVERVIEW_CHUNK_SIZE)
+        ]
+        error: FiftyfiveApiClientError | None = None
+        try:
+            for next_chunk in asyncio.as_completed(tasks):
+                try:
+                    yield await next_chunk
+                except FiftyfiveApiClientAuthenticationError:
+                    raise
+                except FiftyfiveApiClientError as exception:
+                    error = exception
+            if error and all(task.exception() for task in tasks):
+                raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _async_fetch_overviews(
+        self, chargers: list[str], *, paced: bool, attempt: object
+    ) -> dict[str, dict]:
+        details = await self._async_request(
+            "overviews",
+            [Overview(charger) for charger in chargers],
+            background=True,
+            paced=paced,
+            attempt=attempt,
+            timeout=OVERVIEW_CHUNK_TIMEOUT.total_seconds(),
         )
+        return {
+            charger: detail[0]
+            for charger, detail in zip(chargers, details, strict=True)
+        }
 
-        return [c | d[0] for c, d in zip(networks[0], details, strict=True)]
+    def invalidate_card_cache(self, charger: str | None = None) -> None:
+        """Forget the cached card index of a charger, or of all chargers."""
+        if charger is None:
+            self._card_index.clear()
+        else:
+            self._card_index.pop(charger, None)
 
-    async def async_start(self, charger: str, card_id: str) -> Any:
-        """Start charge session."""
-        clients = await self._api.make_requests(
-            [ClientSearch(recharge_spot_id=charger, name="")]
+    async def _async_get_card_index(self, charger: str) -> tuple[dict[str, str], bool]:
+        """Return the card -> customer index of a charger and whether it was cached."""
+        cached = self._card_index.get(charger)
+        if cached and cached[0] > monotonic():
+            self.card_cache_hits += 1
+            return cached[1], True
+        self.card_cache_misses += 1
+
+        index = await self._async_single_flight(
+            f"cards:{charger}", partial(self._async_fetch_card_index, charger)
+        )
+        return index, False
+
+    async def _async_fetch_card_index(self, charger: str) -> dict[str, str]:
+        clients = await self._async_request(
+            "clients", [ClientSearch(recharge_spot_id=charger, name="")]
         )
 
-        card_lists = await self._api.make_requests(
-            [
-                CardSearch(recharge_spot_id=charger, customer_id=client["id"])
-                for client in clients[0]
-            ]
+        index: dict[str, str] = {}
+        if clients[0]:
+            card_lists = await self._async_request(
+                "cards",
+                [
+                    CardSearch(recharge_spot_id=charger, customer_id=client["id"])
+                    for client in clients[0]
+                ],
+            )
+            for client, card_list in zip(clients[0], card_lists, strict=True):
+                for card in card_list:
+                    index.setdefault(card["text"], client["id"])
+
+        self._card_index[charger] = (
+            monotonic() + CARD_CACHE_TTL.total_seconds(),
+            index,
+        )
+        return index
+
+    async def _async_command(self, request: Action) -> Any:
+        """
+        Send a command and return its response.
+
+        A command identical to one still in flight joins it instead of being
+        sent again. Other commands for the same charger wait for their turn.
+        They fail right away while the circuit breaker is open.
+        """
+        if self.breaker.state == "open":
+            msg = f"50five is unreachable, retrying in {self.breaker.retry_in:.0f}s"
+            raise FiftyfiveApiCircuitOpenError(msg)
+        return await self._async_single_flight(
+            dumps(request.request, sort_keys=True),
+            partial(self._async_queue_command, request),
         )
 
-        for i, card_list in enumerate(card_lists):
-            if any(card["text"] == card_id for card in card_list):
-                return await self._api.make_requests(
-                    [
-                        Start(
-                            channel=Channel(recharge_spot_id=charger, channel_id="1"),
-                            customer_id=clients[0][i]["id"],
-                            card_id=card_id,
-                        )
-                    ]
+    async def _async_queue_command(self, request: Action) -> Any:
+        """
+        Queue a command for the next batch and wait for its response.
+
+        Commands issued within COMMAND_BATCH_WINDOW of each other are sent in a
+        single request.
+        """
+        async with self._charger_locks[request.channel.recharge_spot_id]:
+            future = asyncio.get_running_loop().create_future()
+            self._pending.append((request, future))
+            if self._flush_task is None:
+                self._flush_task = asyncio.create_task(self._async_flush_commands())
+                self._flush_task.add_done_callback(self._flush_done)
+            return await future
+
+    async def _async_flush_commands(self) -> None:
+        """
+        Send the queued commands once the batch window has passed.
+
+        Every queued command gets its response or an error, whatever goes
+        wrong, and is cancelled if the flush is, so no caller is left waiting
+        with the lock of its charger.
+        """
+        pending: list[tuple[Action, asyncio.Future]] = []
+        try:
+            await asyncio.sleep(COMMAND_BATCH_WINDOW)
+            pending, self._pending = self._pending, []
+            self._flush_task = None
+
+            responses = await self._async_send_commands(
+                [request for request, _ in pending]
+            )
+            for (_, future), response in zip(pending, responses, strict=True):
+                if not future.done():
+                    future.set_result(response)
+        except Exception as exception:  # noqa: BLE001 Handed to the callers
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(exception)
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def _flush_done(self, task: asyncio.Task) -> None:
+        """Cancel the commands left queued by a flush cancelled before sending."""
+        if self._flush_task is task:
+            pending, self._pending = self._pending, []
+            self._flush_task = None
+            for _, future in pending:
+                future.cancel()
+
+    async def _async_send_commands(self, requests: list[Action]) -> list[Any]:
+        """Send a batch of commands, with a response for every one of them."""
+        responses = await self._async_request("commands", requests)
+        if len(responses) != len(requests):
+            msg = "Unexpected command response"
+            raise FiftyfiveApiClientError(msg)
+        return responses
+
+    async def async_start(self, charger: str, card_id: str) -> Any:
+        """
+        Start charge session.
+
+        The customer owning the card is looked up in the cached card index. If a
+        cached index doesn't know the card or the start gets rejected, the index
+        is refetched and the start retried once.
+        """
+        for retry in (True, False):
+            try:
+                index, cached = await self._async_get_card_index(charger)
+            except FiftyfiveApiNotSentError:
+                raise
+            except FiftyfiveApiClientCommunicationError as exception:
+                # Whatever happened to the lookup, the start wasn't sent
+                raise FiftyfiveApiNotSentError(str(exception)) from exception
+            if card_id in index:
+                result = await self._async_command(
+                    Start(
+                        channel=Channel(recharge_spot_id=charger, channel_id="1"),
+                        customer_id=index[card_id],
+                        card_id=card_id,
+                    )
                 )
+                if not (retry and cached) or result:
+                    return result
+            elif not (retry and cached):
+                break
+            self.invalidate_card_cache(charger)
+
         raise FiftyfiveApiInvalidCardError
 
+    async def async_start_many(self, chargers: Iterable[str], card_id: str) -> dict:
+        """
+        Start charge sessions with one card on several chargers.
+
+        Chargers on which the card can't be found are left out of the result,
+        chargers on which starting failed otherwise map to the error, so one
+        charger failing doesn't hide the outcome on the others.
+        """
+        chargers = list(chargers)
+        results = await asyncio.gather(
+            *(self.async_start(charger, card_id) for charger in chargers),
+            return_exceptions=True,
+        )
+
+        started = {}
+        for charger, result in zip(chargers, results, strict=True):
+            if isinstance(result, FiftyfiveApiInvalidCardError):
+                continue
+            if isinstance(result, BaseException) and not isinstance(
+                result, FiftyfiveApiClientError
+            ):
+                raise result
+            started[charger] = result
+        return started
+
+    async def async_send(
+        self, command: Callable[[Channel], Action], chargers: Iterable[str]
+    ) -> dict:
+        """Send a command to several chargers."""
+        chargers = list(chargers)
+        responses = await asyncio.gather(
+            *(
+                self._async_command(
+                    command(Channel(recharge_spot_id=charger, channel_id="1"))
+                )
+                for charger in chargers
+            )
+        )
+        return dict(zip(chargers, responses, strict=True))
+
     async def async_stop(self, charger: str) -> Any:
         """Stop a charge session."""
-        return await self._api.make_requests(
-            [Stop(channel=Channel(recharge_spot_id=charger, channel_id="1"))]
+        return await self._async_command(
+            Stop(channel=Channel(recharge_spot_id=charger, channel_id="1"))
         )
 
     async def async_soft_reset(self, charger: str) -> Any:
         """Soft reset a charger."""
-        return await self._api.make_requests(
-            [SoftReset(channel=Channel(recharge_spot_id=charger, channel_id="1"))]
+        return await self._async_command(
+            SoftReset(channel=Channel(recharge_spot_id=charger, channel_id="1"))
         )
 
     async def async_hard_reset(self, charger: str) -> Any:
         """Hard reset a charger."""
-        return await self._api.make_requests(
-            [HardReset(channel=Channel(recharge_spot_id=charger, channel_id="1"))]
+        return await self._async_command(
+            HardReset(channel=Channel(recharge_spot_id=charger, channel_id="1"))
         )
 
     async def async_unlock_connector(self, charger: str) -> Any:
         """Unlock the connector from a charger."""
-        return await self._api.make_requests(
-            [UnlockConnector(channel=Channel(recharge_spot_id=charger, channel_id="1"))]
+        return await self._async_command(
+            UnlockConnector(channel=Channel(recharge_spot_id=charger, channel_id="1"))
         )
 
     async def async_block(self, charger: str) -> Any:
         """Block a charger."""
-        return await self._api.make_requests(
-            [Block(channel=Channel(recharge_spot_id=charger, channel_id="1"))]
+        return await self._async_command(
+            Block(channel=Channel(recharge_spot_id=charger, channel_id="1"))
         )
 
     async def async_unblock(self, charger: str) -> Any:
         """Unblock a charger."""
-        return await self._api.make_requests(
-            [Unblock(channel=Channel(recharge_spot_id=charger, channel_id="1"))]
+        return await self._async_command(
+            Unblock(channel=Channel(recharge_spot_id=charger, channel_id="1"))
         )
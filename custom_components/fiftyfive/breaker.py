@@ -0,0 +1,85 @@
+"""Circuit breaker for 50five."""
+
+from __future__ import annotations
+
+import random
+from time import monotonic
+
+from .const import BACKOFF_MAX, BACKOFF_MIN, BREAKER_THRESHOLD
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker of the calls to the 50five cloud of one account.
+
+    Every consecutive failure doubles the jittered backoff, the failing calls
+    of one attempt counting once. After BREAKER_THRESHOLD of them the circuit
+    opens and calls are refused until
+    the backoff ran out. It then lets a single probe through (half open),
+    which closes the circuit if it succeeds.
+    """
+
+    def __init__(self) -> None:
+        """Initialize a closed circuit."""
+        self.failures = 0
+        self._retry_at = 0.0
+        self._probing = False
+        # The attempt of the last failure
+        self._failed_attempt: object | None = None
+
+    @property
+    def state(self) -> str:
+        """Return whether the circuit is closed, open or half open."""
+        if self.failures < BREAKER_THRESHOLD:
+            return "closed"
+        if self._probing or monotonic() < self._retry_at:
+            return "open"
+        return "half_open"
+
+    @property
+    def retry_in(self) -> float:
+        """Return the seconds until calls should be tried again."""
+        return max(0.0, self._retry_at - monotonic())
+
+    def allow_request(self) -> bool:
+        """Return whether a call can go through, as the probe when half open."""
+        state = self.state
+        if state == "half_open":
+            self._probing = True
+        return state != "open"
+
+    def release(self) -> None:
+        """Mark the end of a call that was let through."""
+        self._probing = False
+
+    def record_success(self) -> None:
+        """Close the circuit."""
+        self.failures = 0
+        self._retry_at = 0.0
+        self._failed_attempt = None
+
+    def record_failure(self, attempt: object | None = None) -> None:
+        """
+        Count a failure and back off further.
+
+        Calls made together, like the chunks of a refresh, share an attempt,
+        and only the first of them to fail counts.
+        """
+        if attempt is not None and attempt is self._failed_attempt:
+            return
+        self._failed_attempt = attempt
+        self.failures += 1
+        backoff = min(
+            BACKOFF_MAX.total_seconds(),
+            BACKOFF_MIN.total_seconds() * 2 ** (self.failures - 1),
+        )
+        # Jitter spreads the retries of accounts that failed at the same time
+        self._retry_at = monotonic() + random.uniform(backoff / 2, backoff)  # noqa: S311
+
+    def as_dict(self) -> dict[str, str | float]:
+        """Return the state of the circuit for diagnostics."""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "retry_in": self.retry_in,
+        }
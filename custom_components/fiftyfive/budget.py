@@ -0,0 +1,64 @@
+"""API call budget for 50five."""
+
+from __future__ import annotations
+
+from time import monotonic
+
+from .const import BUDGET_BURST, BUDGET_COMMAND_RESERVE
+
+
+class CallBudget:
+    """
+    Token bucket of API calls, refilled at the budgeted rate.
+
+    The bucket holds BUDGET_BURST worth of the budget. Background polling waits
+    for tokens and leaves BUDGET_COMMAND_RESERVE of them to commands, which are
+    never held back: they may overdraw the bucket, slowing down polling instead.
+    """
+
+    def __init__(self, calls_per_hour: int) -> None:
+        """Initialize a full bucket."""
+        self.calls_per_hour = calls_per_hour
+        self.rate = calls_per_hour / 3600
+        self.capacity = max(1.0, self.rate * BUDGET_BURST.total_seconds())
+        self.reserve = self.capacity * BUDGET_COMMAND_RESERVE
+        self._tokens = self.capacity
+        self._updated = monotonic()
+        self.waited = 0.0
+
+    @property
+    def tokens(self) -> float:
+        """Return the tokens in the bucket, negative when overdrawn."""
+        now = monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+        return self._tokens
+
+    def available(self) -> int:
+        """Return how many calls background polling can make right now."""
+        return max(0, int(self.tokens - self.reserve))
+
+    def delay(self, calls: int) -> float:
+        """
+        Return how long background polling has to wait to make some calls.
+
+        Batches bigger than the bucket only wait for it to be full, and then
+        overdraw it.
+        """
+        needed = min(calls, self.capacity - self.reserve) + self.reserve
+        return max(0.0, (needed - self.tokens) / self.rate)
+
+    def consume(self, calls: int) -> None:
+        """Take tokens for calls that are being made."""
+        self._tokens = self.tokens - calls
+
+    def as_dict(self) -> dict[str, float]:
+        """Return the state of the bucket for diagnostics."""
+        return {
+            "calls_per_hour": self.calls_per_hour,
+            "capacity": self.capacity,
+            "tokens": self.tokens,
+            "waited": self.waited,
+        }
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from homeassistant.components.button import (
     ButtonDeviceClass,
@@ -11,16 +11,17 @@ from homeassistant.components.button import (
     ButtonEntityDescription,
 )
 
-from .entity import FiftyfiveEntity
+from .coordinator import expect_change
+from .entity import FiftyfiveEntity, async_add_charger_entities
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Awaitable, Callable
 
     from homeassistant.core import HomeAssistant
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
     from .api import FiftyfiveApiClient
-    from .coordinator import FiftyfiveDataUpdateCoordinator
+    from .coordinator import Expectation, FiftyfiveDataUpdateCoordinator
     from .data import FiftyfiveConfigEntry
 
 
@@ -29,7 +30,9 @@ class FiftyFiveButtonEntityDescription(ButtonEntityDescription):
     """Class describing 50five button entities."""
 
     # Needs a default because ButtonEntityDescription has defaults
-    press_fn: Callable[[FiftyfiveApiClient, str], None] | None = None
+    press_fn: Callable[[FiftyfiveApiClient, str], Awaitable[Any]] | None = None
+    # How the outcome of the press shows in the charger data
+    expectation: Expectation = expect_change
 
 
 ENTITY_DESCRIPTIONS = (
@@ -69,18 +72,19 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the button platform."""
-    entities: list = [
-        FiftyFiveChargerButton(
-            coordinator=entry.runtime_data.coordinator,
-            entity_description=entity_description,
-            idx=network["IDX"],
-            client=entry.runtime_data.client,
-        )
-        for entity_description in ENTITY_DESCRIPTIONS
-        for network in entry.runtime_data.coordinator.data
-    ]
-
-    async_add_entities(entities)
+    async_add_charger_entities(
+        entry,
+        async_add_entities,
+        lambda idx: (
+            FiftyFiveChargerButton(
+                coordinator=entry.runtime_data.coordinator,
+                entity_description=entity_description,
+                idx=idx,
+                client=entry.runtime_data.client,
+            )
+            for entity_description in ENTITY_DESCRIPTIONS
+        ),
+    )
 
 
 class FiftyFiveChargerButton(FiftyfiveEntity, ButtonEntity):
@@ -94,6 +98,7 @@ class FiftyFiveChargerButton(FiftyfiveEntity, ButtonEntity):
         client: FiftyfiveApiClient,
     ) -> None:
         """Initialize the button class."""
+        # Buttons don't read any charger fields, so they only follow availability
         super().__init__(coordinator, idx)
         self.client = client
         self.entity_description = entity_description
@@ -102,5 +107,7 @@ class FiftyFiveChargerButton(FiftyfiveEntity, ButtonEntity):
     async def async_press(self) -> None:
         """Handle the button press."""
         fn = self.entity_description.press_fn
-        if fn:
-            await fn(self.client, self.idx)
+        if fn and await fn(self.client, self.idx):
+            self.coordinator.async_confirm(
+                self.entity_description.expectation, self.idx
+            )
@@ -7,13 +7,22 @@ from typing import Any
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_COUNTRY, CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import callback
 from homeassistant.helpers import selector
-from homeassistant.helpers.aiohttp_client import async_create_clientsession
 from slugify import slugify
 
 from fiftyfive import Api, CustomerType, Market, NetworkOverview
 
-from .const import CONF_CUST_TYPE, DOMAIN, LOGGER
+from .const import (
+    CONF_CALL_BUDGET,
+    CONF_CUST_TYPE,
+    CONF_RECORD_TRAFFIC,
+    DEFAULT_CALL_BUDGET,
+    DOMAIN,
+    LOGGER,
+    MIN_CALL_BUDGET,
+)
+from .session import async_get_http
 
 
 class FiftyfiveFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
@@ -21,6 +30,14 @@ class FiftyfiveFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 2
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,  # noqa: ARG004 Unused argument
+    ) -> FiftyfiveOptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return FiftyfiveOptionsFlowHandler()
+
     async def async_step_user(
         self,
         user_input: dict | None = None,
@@ -94,11 +111,51 @@ class FiftyfiveFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         self, username: str, password: str, market: Market, customer_type: CustomerType
     ) -> Any:
         """Validate credentials."""
-        client = Api(
-            session=async_create_clientsession(self.hass),
-            email=username,
-            password=password,
-            market=market,
-            customer_type=customer_type,
+        async with async_get_http(self.hass).async_create_session() as session:
+            client = Api(
+                session=session,
+                email=username,
+                password=password,
+                market=market,
+                customer_type=customer_type,
+            )
+            return await client.make_requests([NetworkOverview()])
+
+
+class FiftyfiveOptionsFlowHandler(config_entries.OptionsFlow):
+    """Options flow for FiftyFive."""
+
+    async def async_step_init(
+        self,
+        user_input: dict | None = None,
+    ) -> config_entries.ConfigFlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_CALL_BUDGET,
+                        default=self.config_entry.options.get(
+                            CONF_CALL_BUDGET, DEFAULT_CALL_BUDGET
+                        ),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=MIN_CALL_BUDGET,
+                            step=1,
+                            mode=selector.NumberSelectorMode.BOX,
+                            unit_of_measurement="calls/h",
+                        )
+                    ),
+                    vol.Required(
+                        CONF_RECORD_TRAFFIC,
+                        default=self.config_entry.options.get(
+                            CONF_RECORD_TRAFFIC, False
+                        ),
+                    ): selector.BooleanSelector(),
+                },
+            ),
         )
-        return await client.make_requests([NetworkOverview()])
@@ -8,7 +8,72 @@ LOGGER: Logger = getLogger(__package__)
 DOMAIN = "fiftyfive"
 DEFAULT_UPDATE_INTERVAL = timedelta(minutes=5)
 CHARGING_UPDATE_INTERVAL = timedelta(seconds=5)
+# How many accounts send polling requests at once, their full refreshes are
+# spread out anyway
+MAX_CONCURRENT_REFRESHES = 2
 
-FAST_POLL_TIME = 30
+# Seconds between the polls confirming a command, the last one repeating, and
+# how long to wait for the outcome of a command at most
+CONFIRM_SCHEDULE = (3, 3, 5, 5, 8, 13)
+CONFIRM_TIMEOUT = timedelta(minutes=1)
+
+# Overviews are fetched in chunks of this many chargers, a few chunks at a time,
+# so one slow or failing chunk doesn't hold up or fail the whole refresh
+OVERVIEW_CHUNK_SIZE = 50
+OVERVIEW_CONCURRENCY = 4
+OVERVIEW_CHUNK_TIMEOUT = timedelta(seconds=30)
+
+# Connections to 50five are pooled for all accounts, and kept open between the
+# polls of charging chargers; DNS lookups are cached for the same reason
+HTTP_CONNECTIONS = 10
+HTTP_KEEPALIVE = timedelta(seconds=60)
+HTTP_DNS_CACHE_TTL = timedelta(minutes=5)
+HTTP_CONNECT_TIMEOUT = timedelta(seconds=10)
+HTTP_TIMEOUT = timedelta(minutes=1)
+
+# Seconds over which enabling and disabling entities is coalesced before the
+# chargers to fetch are worked out again
+REGISTRY_UPDATE_COOLDOWN = 1
+
+# How long the card -> customer index of a charger is trusted before refetching
+CARD_CACHE_TTL = timedelta(hours=1)
+# Commands issued within this many seconds of each other are sent together
+COMMAND_BATCH_WINDOW = 0.05
+
+# Backoff after the first failure to reach 50five, doubling with every next one
+BACKOFF_MIN = timedelta(seconds=10)
+BACKOFF_MAX = timedelta(minutes=15)
+
+# Queued commands are retried until they are this old, and their ids remembered
+# this long after they completed so that a repeated call doesn't send them again
+OUTBOX_MAX_AGE = timedelta(hours=1)
+OUTBOX_ID_TTL = timedelta(days=1)
+EVENT_COMMAND_COMPLETED = f"{DOMAIN}_command_completed"
+# Consecutive failures after which calls are refused until the backoff ran out
+BREAKER_THRESHOLD = 3
 
 CONF_CUST_TYPE = "customer_type"
+CONF_CALL_BUDGET = "call_budget"
+CONF_RECORD_TRAFFIC = "record_traffic"
+
+# API calls per hour per account; a batched request counts each of its calls
+DEFAULT_CALL_BUDGET = 2000
+MIN_CALL_BUDGET = 100
+# How much of the budget can be used in a burst, and the share kept for commands
+BUDGET_BURST = timedelta(minutes=5)
+BUDGET_COMMAND_RESERVE = 0.1
+# Longest a background request waits for the budget before overdrawing it, the
+# refresh intervals keep to the budget over time
+BUDGET_MAX_WAIT = timedelta(seconds=30)
+# Share of the budget the fast tier can always use, however long full refreshes
+# of a large account take
+BUDGET_FAST_SHARE = 0.25
+
+# API call batches buffered before they are written to the traffic recording
+RECORD_FLUSH_SIZE = 100
+
+STORAGE_VERSION = 1
+# Snapshots hold parsed charger states since minor version 2
+SNAPSHOT_MINOR_VERSION = 2
+# Snapshot writes are coalesced, fast polling would otherwise write every few seconds
+SNAPSHOT_SAVE_DELAY = 60
@@ -2,50 +2,694 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections import defaultdict
+from contextlib import contextmanager, suppress
+from dataclasses import asdict, dataclass
+from datetime import timedelta
 from time import monotonic
 from typing import TYPE_CHECKING, Any
 
+from homeassistant.core import callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .api import (
     FiftyfiveApiClientAuthenticationError,
+    FiftyfiveApiClientCommunicationError,
     FiftyfiveApiClientError,
 )
-from .const import CHARGING_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL, FAST_POLL_TIME
+from .const import (
+    BUDGET_FAST_SHARE,
+    CHARGING_UPDATE_INTERVAL,
+    CONFIRM_SCHEDULE,
+    CONFIRM_TIMEOUT,
+    DEFAULT_UPDATE_INTERVAL,
+    DOMAIN,
+    LOGGER,
+    REGISTRY_UPDATE_COOLDOWN,
+    SNAPSHOT_MINOR_VERSION,
+    SNAPSHOT_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+from .data import CHARGER_STATE_FIELDS, ChargerState
+from .scheduler import DATA_SCHEDULER
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Collection, Generator, Iterable
+
+    from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant
+    from homeassistant.helpers.entity_registry import EventEntityRegistryUpdatedData
+
     from .data import FiftyfiveConfigEntry
 
+# Context of listeners updated after every refresh, whether data changed or not
+REFRESH_CONTEXT = "refresh"
+
+# Whether a charger state shows the outcome of a command, given the state from
+# when the command was sent
+type Expectation = Callable[[ChargerState, ChargerState], bool]
+
+
+@dataclass(slots=True)
+class _Confirmation:
+    """A command waiting for its outcome to show in the charger data."""
+
+    before: ChargerState
+    expectation: Expectation
+    deadline: float
+    due: float
+    step: int = 0
+
+
+class _SnapshotStore(Store[dict[str, dict]]):
+    """Store of the data snapshot of a config entry."""
+
+    async def _async_migrate_func(
+        self, old_major_version: int, old_minor_version: int, old_data: dict
+    ) -> dict[str, dict]:
+        """Migrate snapshots of raw API records to charger states."""
+        del old_major_version
+        if old_minor_version < 2:  # noqa: PLR2004
+            return {
+                idx: asdict(ChargerState.from_api(record))
+                for idx, record in old_data.items()
+            }
+        return old_data
+
 
 class FiftyfiveDataUpdateCoordinator(DataUpdateCoordinator):
     """Class to manage fetching data from the API."""
 
     config_entry: FiftyfiveConfigEntry
+    data: dict[str, ChargerState]
+
+    def __init__(self, hass: HomeAssistant, config_entry: FiftyfiveConfigEntry) -> None:
+        """Initialize."""
+        super().__init__(
+            hass=hass,
+            logger=LOGGER,
+            config_entry=config_entry,
+            name=DOMAIN,
+            update_interval=DEFAULT_UPDATE_INTERVAL,
+            always_update=False,
+        )
+        # Spreads full refreshes of all accounts and limits concurrent ones
+        self._scheduler = hass.data[DATA_SCHEDULER]
+        # Listeners by charger, or by context for those of no single charger
+        self._listeners_by_key: defaultdict[
+            Any, dict[CALLBACK_TYPE, tuple[CALLBACK_TYPE, frozenset[str]]]
+        ] = defaultdict(dict)
+        # Chargers that changed in the data the listeners are being notified of
+        self.changed_chargers: Collection[str] = ()
+        # Data and availability the listeners were last notified of
+        self._published: dict[str, ChargerState] | None = None
+        self._published_success = True
+        self._published_stale = False
+        # Last good data, so entities can be set up before the first live refresh
+        self._store = _SnapshotStore(
+            hass,
+            STORAGE_VERSION,
+            snapshot_key(config_entry.entry_id),
+            minor_version=SNAPSHOT_MINOR_VERSION,
+        )
+        # Whether the data still comes from the snapshot
+        self.stale = False
+        # Topology and idle chargers are only refreshed by the slow tier
+        self._next_topology_refresh = 0.0
+        # Commanded chargers, polled on their own until the outcome shows
+        self._confirming: dict[str, _Confirmation] = {}
+        self._confirm_task: asyncio.Task | None = None
+        self._confirm_wakeup = asyncio.Event()
+        # Where the fast tier resumes when the budget doesn't fit all active chargers
+        self._fast_offset = 0
+        # Calls per fast poll that the share of the budget of the fast tier allows
+        self._fast_width = 0
+        # Chargers whose overview failed last time, with their NetworkOverview
+        # record if they need one to be parsed
+        self._retry: dict[str, dict | None] = {}
+        # Seconds spent in each phase of the last refresh, and API calls made
+        self.refresh_phases: dict[str, float] = {}
+        self.refresh_calls = 0
+        # Chargers whose entities are all disabled, their overview isn't fetched
+        self.disabled_chargers: frozenset[str] = frozenset()
+        self._disabled_debouncer = Debouncer(
+            hass,
+            LOGGER,
+            cooldown=REGISTRY_UPDATE_COOLDOWN,
+            immediate=False,
+            function=self._async_update_disabled,
+        )
+        config_entry.async_on_unload(
+            hass.bus.async_listen(
+                er.EVENT_ENTITY_REGISTRY_UPDATED,
+                self._async_entity_registry_updated,
+                event_filter=_affects_enabled,
+            )
+        )
+        self._async_update_disabled()
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule a refresh, full refreshes in the slot of the account."""
+        if (
+            self._retry_after is None
+            and self._update_interval_seconds is not None
+            and self._update_interval_seconds >= DEFAULT_UPDATE_INTERVAL.total_seconds()
+        ):
+            # Overrides the interval for this one refresh, like a retry would
+            self._retry_after = self._scheduler.delay(
+                self.config_entry.entry_id, self._update_interval_seconds
+            )
+        super()._schedule_refresh()
+
+    async def async_shutdown(self) -> None:
+        """Cancel any pending work out of the chargers to fetch."""
+        self._disabled_debouncer.async_shutdown()
+        await super().async_shutdown()
+
+    @callback
+    def _async_entity_registry_updated(
+        self,
+        event: Event[EventEntityRegistryUpdatedData],  # noqa: ARG002 Unused method argument: `event`
+    ) -> None:
+        """Work out the chargers to fetch again, once the registry settled."""
+        self._disabled_debouncer.async_schedule_call()
+
+    @callback
+    def _async_update_disabled(self) -> None:
+        """
+        Find the chargers whose entities are all disabled.
+
+        Disabling a device disables its entities too. Chargers without
+        entities yet are fetched, else their entities couldn't be added.
+        Chargers that got enabled are fetched right away.
+        """
+        device_registry = dr.async_get(self.hass)
+        enabled: set[str] = set()
+        disabled: set[str] = set()
+        for entity in er.async_entries_for_config_entry(
+            er.async_get(self.hass), self.config_entry.entry_id
+        ):
+            if not entity.device_id or not (
+                device := device_registry.async_get(entity.device_id)
+            ):
+                continue
+            for domain, idx in device.identifiers:
+                if domain == DOMAIN and idx != self.config_entry.entry_id:
+                    (disabled if entity.disabled else enabled).add(idx)
+
+        previous, self.disabled_chargers = (
+            self.disabled_chargers,
+            frozenset(disabled - enabled),
+        )
+        if previous != self.disabled_chargers:
+            LOGGER.debug("Not fetching disabled chargers %s", self.disabled_chargers)
+        for idx in self.disabled_chargers.intersection(self._retry):
+            del self._retry[idx]
+        if self.data and (
+            reenabled := [
+                idx for idx in previous - self.disabled_chargers if idx in self.data
+            ]
+        ):
+            self._retry.update(dict.fromkeys(reenabled))
+            self.config_entry.async_create_background_task(
+                self.hass, self.async_request_refresh(), f"{DOMAIN} enabled chargers"
+            )
+
+    @property
+    def networks(self) -> list[ChargerState]:
+        """Return the charger states as a list, in account order."""
+        return list(self.data.values())
+
+    async def async_restore_snapshot(self) -> bool:
+        """Use the last persisted data until the first refresh, if there is any."""
+        if (snapshot := await self._store.async_load()) is None:
+            return False
+        self.data = {idx: ChargerState(**state) for idx, state in snapshot.items()}
+        self.stale = True
+        # Entities are set up from it, so the first refresh only sends changes
+        self._published, self._published_stale = self.data, True
+        return True
+
+    @callback
+    def _async_refresh_finished(self) -> None:
+        """
+        Persist the data once it was refreshed successfully, notify refreshes.
+
+        When availability changed, or restored data stopped being stale, every
+        listener is notified, even if no charger changed. Refresh listeners
+        are among them, so they aren't called a second time, and the update of
+        the listeners that follows has nothing left to send.
+        """
+        if self.last_update_success:
+            self.stale = False
+            self._store.async_delay_save(self._snapshot, SNAPSHOT_SAVE_DELAY)
+        if self._status_changed():
+            self.async_update_listeners()
+            return
+        for update_callback, _ in list(
+            self._listeners_by_key[REFRESH_CONTEXT].values()
+        ):
+            update_callback()
+
+    def _snapshot(self) -> dict[str, dict]:
+        """Return the data as stored in the snapshot."""
+        return {idx: asdict(state) for idx, state in self.data.items()}
+
+    @property
+    def refresh_duration(self) -> float:
+        """Return how long the last refresh took."""
+        return sum(self.refresh_phases.values())
+
+    @contextmanager
+    def _phase(self, name: str) -> Generator[None]:
+        """Time a phase of the refresh, adding up when it is entered repeatedly."""
+        start = monotonic()
+        try:
+            yield
+        finally:
+            self.refresh_phases[name] = (
+                self.refresh_phases.get(name, 0.0) + monotonic() - start
+            )
+
+    @callback
+    def async_add_listener(
+        self, update_callback: CALLBACK_TYPE, context: Any = None
+    ) -> Callable[[], None]:
+        """Listen for data updates, indexing the listeners of chargers."""
+        remove_listener = super().async_add_listener(update_callback, context)
+        if isinstance(context, tuple):
+            key, fields = context
+        else:
+            key, fields = context, frozenset()
+        listeners = self._listeners_by_key[key]
+        listeners[remove_listener] = (update_callback, fields)
+
+        @callback
+        def _remove_listener() -> None:
+            remove_listener()
+            listeners.pop(remove_listener, None)
+            if not listeners and self._listeners_by_key.get(key) is listeners:
+                del self._listeners_by_key[key]
+
+        return _remove_listener
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify only the listeners whose charger fields changed."""
+        with self._phase("notify"):
+            self._async_notify_changed()
+
+    @callback
+    def _async_publish(
+        self, data: dict[str, ChargerState], chargers: Iterable[str]
+    ) -> None:
+        """Publish data in which only the given chargers changed."""
+        self.data = data
+        with self._phase("notify"):
+            self._async_notify_changed(chargers)
+
+    @callback
+    def _async_notify_changed(self, chargers: Iterable[str] | None = None) -> None:
+        status_changed = self._status_changed()
+        previous, self._published = self._published, self.data
+        if status_changed:
+            self._published_success = self.last_update_success
+            self._published_stale = self.stale
+            self.changed_chargers = (self.data or {}).keys()
+            super().async_update_listeners()
+            return
+        if previous is self.data:
+            return
+
+        changed = {
+            idx: _changed_fields(previous.get(idx), state)
+            for idx in (self.data if chargers is None else chargers)
+            if previous.get(idx) != (state := self.data[idx])
+        }
+        self.changed_chargers = changed.keys()
+        for update_callback, _ in list(self._listeners_by_key[None].values()):
+            update_callback()
+        for idx, fields in changed.items():
+            for update_callback, listened in list(
+                self._listeners_by_key.get(idx, {}).values()
+            ):
+                if not listened.isdisjoint(fields):
+                    update_callback()
+
+    def _status_changed(self) -> bool:
+        """Return whether availability or staleness changed since published."""
+        return (
+            self._published is None
+            or self._published_success != self.last_update_success
+            or self._published_stale != self.stale
+        )
+
+    @property
+    def active_chargers(self) -> list[str]:
+        """Return the chargers that need fast polling."""
+        return [
+            idx
+            for idx, state in self.data.items()
+            if state.charging and idx not in self.disabled_chargers
+        ]
+
+    @property
+    def confirming(self) -> list[str]:
+        """Return the chargers waiting for the outcome of a command."""
+        return list(self._confirming)
+
+    @property
+    def retrying(self) -> list[str]:
+        """Return the chargers whose last overview failed."""
+        return list(self._retry)
 
-    async def start_fast_polling(self) -> None:
-        """Start polling at increased rate."""
-        self.fast_polling_until = monotonic() + FAST_POLL_TIME
-        await self.async_request_refresh()
+    @callback
+    def async_confirm(self, expectation: Expectation, *chargers: str) -> None:
+        """
+        Poll commanded chargers until the outcome of the command shows.
 
-    async def _async_update_data(self) -> Any:
-        """Update data via library."""
+        Each charger is polled after the delays of CONFIRM_SCHEDULE, the last
+        one repeating, until its data meets the expectation or CONFIRM_TIMEOUT
+        passed. Chargers due at the same time are polled together.
+        """
+        now = monotonic()
+        for idx in chargers:
+            if idx in self.data:
+                self._confirming[idx] = _Confirmation(
+                    before=self.data[idx],
+                    expectation=expectation,
+                    deadline=now + CONFIRM_TIMEOUT.total_seconds(),
+                    due=now + CONFIRM_SCHEDULE[0],
+                )
+
+        if self._confirm_task is None or self._confirm_task.done():
+            self._confirm_task = self.config_entry.async_create_background_task(
+                self.hass, self._async_confirm_commands(), f"{DOMAIN} confirm commands"
+            )
+        else:
+            self._confirm_wakeup.set()
+
+    async def _async_confirm_commands(self) -> None:
+        """Poll the chargers that are due until all commands are confirmed."""
+        while self._confirming:
+            now = monotonic()
+            due_at = min(confirmation.due for confirmation in self._confirming.values())
+            if due_at > now:
+                # Wait, unless a command is confirmed in the meantime
+                self._confirm_wakeup.clear()
+                with suppress(TimeoutError):
+                    async with asyncio.timeout(due_at - now):
+                        await self._confirm_wakeup.wait()
+                continue
+
+            due = {
+                idx: confirmation
+                for idx, confirmation in self._confirming.items()
+                if confirmation.due <= now
+            }
+            try:
+                states = await self.async_refresh_chargers(*due)
+            except FiftyfiveApiClientError as exception:
+                LOGGER.debug("Confirming commands failed: %s", exception)
+                states = {}
+
+            now = monotonic()
+            for idx, confirmation in due.items():
+                if self._confirming.get(idx) is not confirmation:
+                    # Superseded by a later command while polling
+                    continue
+                state = states.get(idx)
+                if state and confirmation.expectation(confirmation.before, state):
+                    LOGGER.debug("Command on charger %s confirmed", idx)
+                    del self._confirming[idx]
+                elif now >= confirmation.deadline:
+                    LOGGER.debug("Command on charger %s not confirmed in time", idx)
+                    del self._confirming[idx]
+                else:
+                    confirmation.step += 1
+                    confirmation.due = (
+                        now
+                        + CONFIRM_SCHEDULE[
+                            min(confirmation.step, len(CONFIRM_SCHEDULE) - 1)
+                        ]
+                    )
+
+    async def async_refresh_chargers(self, *chargers: str) -> dict[str, ChargerState]:
+        """
+        Refresh some chargers without a full account cycle.
+
+        Their overview is merged into the current data and published right
+        away. Returns the new states of the chargers.
+        """
+        client = self.config_entry.runtime_data.client
+        details = await client.async_get_overviews(list(chargers))
+        states = {
+            idx: self.data[idx].with_overview(detail)
+            for idx, detail in details.items()
+            if idx in self.data
+        }
+        self._async_publish(self.data | states, states)
+
+        # A charger that started charging brings the next refresh forward, the
+        # schedule is otherwise left alone
+        interval = timedelta(seconds=self._next_interval(self.data))
+        if self.update_interval and interval < self.update_interval:
+            self.update_interval = interval
+            self._schedule_refresh()
+        return states
+
+    async def _async_update_data(self) -> dict[str, ChargerState]:
+        """
+        Update data via library.
+
+        The slow tier fetches the topology and every charger. In between, the
+        fast tier only fetches the overview of active chargers, and of chargers
+        that failed last time, and merges it into the previous data. Both tiers
+        slow down and the fast tier narrows down to stay within the call budget
+        of the account. Chargers whose entities are all disabled are left out
+        of both, only their NetworkOverview record is kept up to date.
+        """
+        client = self.config_entry.runtime_data.client
+        budget = client.budget
+        calls = client.metrics.calls.total()
+        self.refresh_phases = {}
+        now = monotonic()
+        active = self.active_chargers if self.data is not None else []
+        topology_due = now >= self._next_topology_refresh and not budget.delay(
+            self._full_calls(self.data or {})
+        )
+
+        full = not (active or self._retry) or topology_due
+
+        if full:
+            self._scheduler.async_refresh_started(self.config_entry.entry_id)
         try:
-            networks = await self.config_entry.runtime_data.client.async_get_data()
+            if full:
+                with self._phase("networks"):
+                    networks = {
+                        network["IDX"]: network
+                        for network in await client.async_get_networks()
+                    }
+                # The first full refresh, restored data or not, doesn't
+                # wait for the budget; the next ones wait for the bucket
+                # to refill instead
+                data = await self._async_fetch_overviews(
+                    {
+                        idx: network
+                        for idx, network in networks.items()
+                        if idx not in self.disabled_chargers
+                    },
+                    self._carried_over(networks),
+                    paced=not self._next_topology_refresh,
+                )
+                self._next_topology_refresh = now + self._slow_interval(
+                    self._full_calls(data)
+                )
+            else:
+                batch = self._fast_batch(
+                    active, max(budget.available(), self._fast_width)
+                )
+                # Paced by the share of the fast tier, not by the bucket
+                data = await self._async_fetch_overviews(
+                    dict.fromkeys(batch) | self._retry,
+                    self.data,
+                    paced=True,
+                )
         except FiftyfiveApiClientAuthenticationError as exception:
             raise ConfigEntryAuthFailed(exception) from exception
+        except FiftyfiveApiClientCommunicationError as exception:
+            # Back off instead of retrying a dead endpoint at the polling rate
+            retry_after = max(
+                client.breaker.retry_in, self.update_interval.total_seconds()
+            )
+            raise UpdateFailed(exception, retry_after=retry_after) from exception
         except FiftyfiveApiClientError as exception:
             raise UpdateFailed(exception) from exception
-        else:
-            charging = any(int(n["STATUS"] or "0") > 0 for n in networks)
-            interval = CHARGING_UPDATE_INTERVAL if charging else DEFAULT_UPDATE_INTERVAL
-
-            # During fast polling we disregard charger status
-            # This allows us to do a short time of fast polling after a session start
-            if monotonic() < self.fast_polling_until:
-                self.fast_polling_until -= 1
-                if self.update_interval != CHARGING_UPDATE_INTERVAL:
-                    self.update_interval = CHARGING_UPDATE_INTERVAL
-            elif self.update_interval != interval:
-                self.update_interval = interval
-            return networks
+        finally:
+            self.refresh_calls = client.metrics.calls.total() - calls
+
+        self.update_interval = timedelta(seconds=self._next_interval(data))
+        return data
+
+    def _carried_over(
+        self, networks: dict[str, dict[str, Any]]
+    ) -> dict[str, ChargerState]:
+        """
+        Return the states of the chargers on the account before fetching them.
+
+        Disabled chargers get theirs from their NetworkOverview record, as
+        their overview isn't fetched.
+        """
+        previous = self.data or {}
+        states = {}
+        for idx, network in networks.items():
+            if idx in self.disabled_chargers:
+                states[idx] = (
+                    previous[idx].with_network(network)
+                    if idx in previous
+                    else ChargerState.from_network(network)
+                )
+            elif idx in previous:
+                states[idx] = previous[idx]
+        return states
+
+    async def _async_fetch_overviews(
+        self,
+        chargers: dict[str, dict | None],
+        data: dict[str, ChargerState],
+        *,
+        paced: bool = False,
+    ) -> dict[str, ChargerState]:
+        """
+        Fetch the overview of chargers and return the data updated with them.
+
+        The chargers map to their NetworkOverview record, or to None to update
+        their state in the data. Every chunk is published as soon as it
+        arrives. Chargers whose chunk failed keep their state, if they had one,
+        and are retried by the next refresh. Unless paced, chunks wait for the
+        call budget.
+        """
+        client = self.config_entry.runtime_data.client
+        chargers = {
+            idx: network
+            for idx, network in chargers.items()
+            if network is not None or idx in data
+        }
+        failed = dict(chargers)
+        chunks = aiter(client.async_iter_overviews(list(chargers), paced=paced))
+        while True:
+            with self._phase("overviews"):
+                details = await anext(chunks, None)
+            if details is None:
+                break
+            with self._phase("process"):
+                data = data | {
+                    idx: ChargerState.from_api(network | detail)
+                    if (network := chargers[idx]) is not None
+                    else data[idx].with_overview(detail)
+                    for idx, detail in details.items()
+                }
+                for idx in details:
+                    del failed[idx]
+            self._async_publish(data, details)
+
+        if failed:
+            LOGGER.debug("Fetching chargers %s failed, retrying", ", ".join(failed))
+        self._retry = failed
+        return data
+
+    def _full_calls(self, data: dict[str, ChargerState]) -> int:
+        """Return the API calls of a full refresh of the chargers in the data."""
+        return 1 + len(data.keys() - self.disabled_chargers)
+
+    def _slow_interval(self, calls: int) -> float:
+        """
+        Return the slow tier interval, in seconds, that the budget allows.
+
+        The slow tier leaves BUDGET_FAST_SHARE of the budget to the fast tier.
+        """
+        budget = self.config_entry.runtime_data.client.budget
+        return max(
+            DEFAULT_UPDATE_INTERVAL.total_seconds(),
+            calls / (budget.rate * (1 - BUDGET_FAST_SHARE)),
+        )
+
+    def _fast_batch(self, active: list[str], width: int) -> list[str]:
+        """Return the active chargers to poll, taking turns if not all fit."""
+        if width >= len(active):
+            return active
+        start = self._fast_offset % len(active)
+        self._fast_offset = start + width
+        return (active[start:] + active[:start])[:width]
+
+    def _next_interval(self, data: dict[str, ChargerState]) -> float:
+        """
+        Return the seconds until the next refresh.
+
+        The fast tier, which also retries failed chargers, gets the part of
+        the budget the slow tier leaves, at least BUDGET_FAST_SHARE of it. It
+        keeps to that rate rather than to the bucket, which full refreshes of
+        large accounts overdraw. The slow tier waits while the bucket is
+        overdrawn, by itself or by commands.
+        """
+        budget = self.config_entry.runtime_data.client.budget
+        calls = self._full_calls(data)
+        slow = self._slow_interval(calls)
+        fast = {
+            idx
+            for idx, state in data.items()
+            if state.charging and idx not in self.disabled_chargers
+        }
+        fast.update(self._retry)
+        if not fast:
+            return max(slow, budget.delay(calls))
+
+        spare = budget.rate - calls / slow
+        interval = min(
+            slow, max(CHARGING_UPDATE_INTERVAL.total_seconds(), len(fast) / spare)
+        )
+        self._fast_width = max(1, int(spare * interval))
+        return interval
+
+
+def _changed_fields(old: ChargerState | None, new: ChargerState) -> set[str]:
+    """Return the fields of a charger state that differ from its previous version."""
+    if old is None:
+        return set(CHARGER_STATE_FIELDS)
+    return {
+        field
+        for field in CHARGER_STATE_FIELDS
+        if getattr(old, field) != getattr(new, field)
+    }
+
+
+@callback
+def _affects_enabled(event_data: EventEntityRegistryUpdatedData) -> bool:
+    """Return whether an entity registry update may enable or disable a charger."""
+    return event_data["action"] != "update" or "disabled_by" in event_data["changes"]
+
+
+def snapshot_key(entry_id: str) -> str:
+    """Return the storage key of the data snapshot of a config entry."""
+    return f"{DOMAIN}.{entry_id}"
+
+
+def expect_charging(_: ChargerState, state: ChargerState) -> bool:
+    """Return whether a charger started charging."""
+    return state.charging
+
+
+def expect_idle(_: ChargerState, state: ChargerState) -> bool:
+    """Return whether a charger stopped charging."""
+    return not state.charging
+
+
+def expect_change(before: ChargerState, state: ChargerState) -> bool:
+    """Return whether the status of a charger changed."""
+    return state.status != before.status or state.notification != before.notification
@@ -2,8 +2,8 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from dataclasses import dataclass, fields, replace
+from typing import TYPE_CHECKING, Any, Self
 
 if TYPE_CHECKING:
     from homeassistant.config_entries import ConfigEntry
@@ -11,6 +11,7 @@ if TYPE_CHECKING:
 
     from .api import FiftyfiveApiClient
     from .coordinator import FiftyfiveDataUpdateCoordinator
+    from .outbox import CommandOutbox
 
 
 type FiftyfiveConfigEntry = ConfigEntry[FiftyfiveData]
@@ -23,3 +24,89 @@ class FiftyfiveData:
     client: FiftyfiveApiClient
     coordinator: FiftyfiveDataUpdateCoordinator
     integration: Integration
+    outbox: CommandOutbox
+
+
+@dataclass(frozen=True, slots=True)
+class ChargerState:
+    """State of a charger, parsed once per poll from its API records."""
+
+    idx: str
+    name: str
+    software_version: str | None
+    connector: str | None
+    status: int
+    power_kw: float
+    energy_kwh: float
+    duration_min: int
+    card: str | None
+    notification: str | None
+
+    @classmethod
+    def from_api(cls, record: dict[str, Any]) -> Self:
+        """Parse the merged NetworkOverview and Overview records of a charger."""
+        return cls(
+            idx=record["IDX"],
+            name=record["NAME"] or record["IDX"],
+            software_version=record["SOFTWARE_VERSION"],
+            connector=record["CONNECTOR"],
+            **_parse_overview(record),
+        )
+
+    @classmethod
+    def from_network(cls, record: dict[str, Any]) -> Self:
+        """Parse the NetworkOverview record of a charger without its Overview."""
+        return cls(
+            idx=record["IDX"],
+            name=record["NAME"] or record["IDX"],
+            software_version=record["SOFTWARE_VERSION"],
+            connector=record["CONNECTOR"],
+            status=0,
+            power_kw=0,
+            energy_kwh=0,
+            duration_min=0,
+            card=None,
+            notification=None,
+        )
+
+    def with_network(self, network: dict[str, Any]) -> Self:
+        """Return the state updated with a newer NetworkOverview record."""
+        return replace(
+            self,
+            name=network["NAME"] or network["IDX"],
+            software_version=network["SOFTWARE_VERSION"],
+            connector=network["CONNECTOR"],
+        )
+
+    def with_overview(self, overview: dict[str, Any]) -> Self:
+        """Return the state updated with a newer Overview record."""
+        return replace(self, **_parse_overview(overview))
+
+    @property
+    def charging(self) -> bool:
+        """Return whether the charger has an active session."""
+        return self.status > 0
+
+
+# Names of the ChargerState fields, which entities subscribe to
+CHARGER_STATE_FIELDS = tuple(field.name for field in fields(ChargerState))
+
+
+def _parse_overview(overview: dict[str, Any]) -> dict[str, Any]:
+    """Parse the fields of an Overview record."""
+    return {
+        "status": int(overview["STATUS"] or "0"),
+        "power_kw": overview["MOM_POWER_KW"] or 0,
+        "energy_kwh": overview["TRANS_ENERGY_DELIVERED_KWH"] or 0,
+        "duration_min": hm_to_m(overview["TRANSACTION_TIME_H_M"]),
+        "card": overview["CARDID"],
+        "notification": overview["NOTIFICATION"],
+    }
+
+
+def hm_to_m(value: str) -> int:
+    """Convert hh:mm duration into minutes."""
+    if not value:
+        return 0
+    hours, minutes = map(int, value.split(":"))
+    return 60 * hours + minutes
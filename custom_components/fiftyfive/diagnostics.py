@@ -0,0 +1,57 @@
+"""Diagnostics support for 50five."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+
+from .scheduler import DATA_SCHEDULER
+from .session import async_get_http
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .data import FiftyfiveConfigEntry
+
+# The title and unique id of an entry are the email address of the account
+TO_REDACT = {CONF_USERNAME, CONF_PASSWORD, "title", "unique_id"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant,
+    entry: FiftyfiveConfigEntry,
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = entry.runtime_data.coordinator
+    client = entry.runtime_data.client
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": str(coordinator.update_interval),
+            "stale": coordinator.stale,
+            "chargers": len(coordinator.data or {}),
+            "active_chargers": coordinator.active_chargers
+            if coordinator.data is not None
+            else [],
+            "confirming": coordinator.confirming,
+            "retrying": coordinator.retrying,
+            "disabled_chargers": sorted(coordinator.disabled_chargers),
+            "refresh_duration": coordinator.refresh_duration,
+            "refresh_phases": coordinator.refresh_phases,
+            "refresh_calls": coordinator.refresh_calls,
+        },
+        "api": client.metrics.as_dict()
+        | {
+            "card_cache_hits": client.card_cache_hits,
+            "card_cache_misses": client.card_cache_misses,
+            "budget": client.budget.as_dict(),
+            "breaker": client.breaker.as_dict(),
+        },
+        "outbox": entry.runtime_data.outbox.as_dict(),
+        "connections": async_get_http(hass).stats.as_dict(),
+        "scheduler": hass.data[DATA_SCHEDULER].as_dict()
+        | {"phase": hass.data[DATA_SCHEDULER].phase(entry.entry_id)},
+    }
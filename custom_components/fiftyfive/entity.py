@@ -2,11 +2,57 @@
 
 from __future__ import annotations
 
-from homeassistant.helpers.device_registry import CONNECTION_NETWORK_MAC, DeviceInfo
+from typing import TYPE_CHECKING
+
+from homeassistant.core import callback
+from homeassistant.helpers.device_registry import (
+    CONNECTION_NETWORK_MAC,
+    DeviceEntryType,
+    DeviceInfo,
+)
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
-from .coordinator import FiftyfiveDataUpdateCoordinator
+from .coordinator import REFRESH_CONTEXT, FiftyfiveDataUpdateCoordinator
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from homeassistant.helpers.entity import Entity
+    from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+    from .data import ChargerState, FiftyfiveConfigEntry
+
+
+@callback
+def async_add_charger_entities(
+    entry: FiftyfiveConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+    create: Callable[[str], Iterable[Entity]],
+) -> None:
+    """
+    Add the entities of every charger, then of new chargers as they show up.
+
+    The entities of a charger that disappears are removed with its device.
+    """
+    coordinator = entry.runtime_data.coordinator
+    known: set[str] = set()
+
+    @callback
+    def _async_add_new_chargers() -> None:
+        chargers = coordinator.data.keys()
+        if chargers == known:
+            return
+        new = chargers - known
+        known.clear()
+        known.update(chargers)
+        if new:
+            async_add_entities([entity for idx in new for entity in create(idx)])
+
+    _async_add_new_chargers()
+    entry.async_on_unload(
+        coordinator.async_add_listener(_async_add_new_chargers, context=REFRESH_CONTEXT)
+    )
 
 
 class FiftyfiveEntity(CoordinatorEntity[FiftyfiveDataUpdateCoordinator]):
@@ -14,26 +60,68 @@ class FiftyfiveEntity(CoordinatorEntity[FiftyfiveDataUpdateCoordinator]):
 
     _attr_has_entity_name = True
 
-    def __init__(self, coordinator: FiftyfiveDataUpdateCoordinator, idx: str) -> None:
-        """Initialize."""
-        super().__init__(coordinator)
+    def __init__(
+        self,
+        coordinator: FiftyfiveDataUpdateCoordinator,
+        idx: str,
+        fields: Iterable[str] = (),
+    ) -> None:
+        """
+        Initialize.
+
+        The entity only gets notified of coordinator updates when one of the
+        given fields of its charger changed, or when availability changes.
+        """
+        super().__init__(coordinator, context=(idx, frozenset(fields)))
         self.idx = idx
 
     @property
-    def network(self) -> dict:
-        """Return the network entry for this entity from the latest coordinator data."""
-        return next(n for n in self.coordinator.data if n["IDX"] == self.idx)
+    def available(self) -> bool:
+        """Return False once the charger is gone, until the entity is removed."""
+        return super().available and self.idx in self.coordinator.data
+
+    @property
+    def charger(self) -> ChargerState:
+        """Return the state of the charger of this entity from the latest data."""
+        return self.coordinator.data[self.idx]
+
+    @property
+    def assumed_state(self) -> bool:
+        """Return True while the data comes from the startup snapshot."""
+        return self.coordinator.stale
 
     @property
     def device_info(self) -> DeviceInfo:
         """Return device info dynamically from the latest data."""
-        net = self.network
+        charger = self.charger
         return DeviceInfo(
             identifiers={(DOMAIN, self.idx)},
             connections={(CONNECTION_NETWORK_MAC, self.idx)},
             manufacturer="50five",
-            sw_version=net["SOFTWARE_VERSION"],
-            name=net["NAME"] or self.idx,
+            sw_version=charger.software_version,
+            name=charger.name,
             model="EV Charger",
-            model_id=net["CONNECTOR"],
+            model_id=charger.connector,
+        )
+
+
+class FiftyfiveAccountEntity(CoordinatorEntity[FiftyfiveDataUpdateCoordinator]):
+    """Defines a Fiftyfive entity of the account, updated after every refresh."""
+
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator: FiftyfiveDataUpdateCoordinator) -> None:
+        """Initialize."""
+        super().__init__(coordinator, context=REFRESH_CONTEXT)
+        entry = coordinator.config_entry
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            manufacturer="50five",
+            name=entry.title,
+            entry_type=DeviceEntryType.SERVICE,
         )
+
+    @property
+    def available(self) -> bool:
+        """Return True, metrics matter most when refreshes fail."""
+        return True
@@ -0,0 +1,140 @@
+"""Performance metrics for 50five."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+    from types import SimpleNamespace
+
+# Upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+@dataclass(slots=True)
+class LatencyHistogram:
+    """Histogram of request latencies."""
+
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    count: int = 0
+    total: float = 0.0
+    maximum: float = 0.0
+    last: float | None = None
+
+    def record(self, seconds: float) -> None:
+        """Record the latency of a request."""
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.maximum = max(self.maximum, seconds)
+        self.last = seconds
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean latency."""
+        return self.total / self.count if self.count else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram for diagnostics."""
+        bounds = [f"<={bound}s" for bound in LATENCY_BUCKETS] + ["+Inf"]
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "max": self.maximum,
+            "last": self.last,
+            "buckets": dict(zip(bounds, self.buckets, strict=True)),
+        }
+
+
+@dataclass
+class ApiMetrics:
+    """Metrics of the requests made by an API client, by request type."""
+
+    latency: defaultdict[str, LatencyHistogram] = field(
+        default_factory=lambda: defaultdict(LatencyHistogram)
+    )
+    # API calls, several of which can be batched in one HTTP request
+    calls: Counter[str] = field(default_factory=Counter)
+    requests: Counter[str] = field(default_factory=Counter)
+    errors: Counter[str] = field(default_factory=Counter)
+    bytes_received: int = 0
+
+    @contextmanager
+    def measure(self, kind: str, calls: int = 1) -> Generator[None]:
+        """Measure a request of the given type, batching a number of API calls."""
+        self.requests[kind] += 1
+        self.calls[kind] += calls
+        start = monotonic()
+        try:
+            yield
+        except Exception:
+            self.errors[kind] += 1
+            raise
+        finally:
+            self.latency[kind].record(monotonic() - start)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics for diagnostics."""
+        return {
+            "latency": {kind: hist.as_dict() for kind, hist in self.latency.items()},
+            "calls": dict(self.calls),
+            "requests": dict(self.requests),
+            "errors": dict(self.errors),
+            "bytes_received": self.bytes_received,
+        }
+
+
+@dataclass
+class ConnectionStats:
+    """Connections opened and reused by the HTTP sessions, and DNS cache use."""
+
+    created: int = 0
+    reused: int = 0
+    dns_hits: int = 0
+    dns_misses: int = 0
+    trace_config: aiohttp.TraceConfig = field(
+        default_factory=aiohttp.TraceConfig, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        """Count into the statistics from the trace config."""
+        self.trace_config.on_connection_create_end.append(self._on_created)
+        self.trace_config.on_connection_reuseconn.append(self._on_reused)
+        self.trace_config.on_dns_cache_hit.append(self._on_dns_hit)
+        self.trace_config.on_dns_cache_miss.append(self._on_dns_miss)
+
+    async def _on_created(self, *_: aiohttp.ClientSession | SimpleNamespace) -> None:
+        self.created += 1
+
+    async def _on_reused(self, *_: aiohttp.ClientSession | SimpleNamespace) -> None:
+        self.reused += 1
+
+    async def _on_dns_hit(self, *_: aiohttp.ClientSession | SimpleNamespace) -> None:
+        self.dns_hits += 1
+
+    async def _on_dns_miss(self, *_: aiohttp.ClientSession | SimpleNamespace) -> None:
+        self.dns_misses += 1
+
+    @property
+    def reuse_ratio(self) -> float | None:
+        """Return the share of requests that reused an open connection."""
+        total = self.created + self.reused
+        return self.reused / total if total else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics for diagnostics."""
+        return {
+            "created": self.created,
+            "reused": self.reused,
+            "reuse_ratio": self.reuse_ratio,
+            "dns_cache_hits": self.dns_hits,
+            "dns_cache_misses": self.dns_misses,
+        }
@@ -0,0 +1,329 @@
+"""Outbox of the commands queued for 50five."""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import suppress
+from time import time
+from typing import TYPE_CHECKING, Any, TypedDict
+
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util.ulid import ulid_now
+
+from fiftyfive import Block, HardReset, SoftReset, Stop, Unblock, UnlockConnector
+
+from .api import (
+    FiftyfiveApiClientError,
+    FiftyfiveApiInvalidCardError,
+    FiftyfiveApiNotSentError,
+)
+from .const import (
+    BACKOFF_MAX,
+    BACKOFF_MIN,
+    DOMAIN,
+    EVENT_COMMAND_COMPLETED,
+    LOGGER,
+    OUTBOX_ID_TTL,
+    OUTBOX_MAX_AGE,
+    STORAGE_VERSION,
+)
+from .coordinator import expect_change, expect_charging, expect_idle
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from homeassistant.core import HomeAssistant
+
+    from fiftyfive import Action, Channel
+
+    from .coordinator import Expectation
+    from .data import FiftyfiveConfigEntry
+
+START_CHARGE_SESSION = "start_charge_session"
+
+# Commands that can be queued, by the service queueing them, and the outcome
+# confirming them; starting a session needs a card on top
+COMMANDS: dict[str, tuple[Callable[[Channel], Action], Expectation]] = {
+    "stop_charge_session": (Stop, expect_idle),
+    "soft_reset_charger": (SoftReset, expect_change),
+    "hard_reset_charger": (HardReset, expect_change),
+    "unlock_connector": (UnlockConnector, expect_change),
+    "block_charger": (Block, expect_change),
+    "unblock_charger": (Unblock, expect_change),
+}
+
+
+class QueuedCommand(TypedDict):
+    """A command waiting in the outbox."""
+
+    id: str
+    service: str
+    charger: str
+    card: str | None
+    # Timestamps of when it was queued and when it is sent next
+    created: float
+    next_attempt: float
+    attempts: int
+    error: str | None
+
+
+class OutboxData(TypedDict):
+    """Persisted outbox, with the ids of recently completed commands."""
+
+    commands: list[QueuedCommand]
+    completed: dict[str, float]
+
+
+class CommandOutbox:
+    """
+    Sends the queued commands of an account in the background.
+
+    Commands are persisted until they completed, so they survive restarts and
+    outages of 50five. Due commands are sent together, the client batching
+    them, and those that didn't reach 50five are retried with a backoff until
+    OUTBOX_MAX_AGE. Those that may have reached it, like on a timeout, aren't
+    sent twice: they complete with an unknown outcome. Every command ends with
+    an EVENT_COMMAND_COMPLETED event.
+    A command id is only queued once, so a call repeated with the same
+    idempotency key doesn't send its commands again.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: FiftyfiveConfigEntry) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.entry = entry
+        self._store: Store[OutboxData] = Store(
+            hass, STORAGE_VERSION, outbox_key(entry.entry_id)
+        )
+        self._commands: dict[str, QueuedCommand] = {}
+        self._completed: dict[str, float] = {}
+        self._task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+        self.succeeded = 0
+        self.failed = 0
+        self.retries = 0
+
+    @property
+    def depth(self) -> int:
+        """Return the number of queued commands."""
+        return len(self._commands)
+
+    @property
+    def oldest_age(self) -> float | None:
+        """Return how long the oldest queued command has been waiting, in seconds."""
+        if not self._commands:
+            return None
+        return time() - min(command["created"] for command in self._commands.values())
+
+    async def async_load(self) -> None:
+        """Load the commands left over from before a restart."""
+        if (data := await self._store.async_load()) is None:
+            return
+        self._commands = {command["id"]: command for command in data["commands"]}
+        self._completed = data["completed"]
+        if self._commands:
+            LOGGER.debug("Resuming %s queued commands", len(self._commands))
+
+    @callback
+    def async_start(self) -> None:
+        """Send the queued commands in the background, while there are any."""
+        if not self._commands:
+            return
+        if self._task is None or self._task.done():
+            self._task = self.entry.async_create_background_task(
+                self.hass, self._async_run(), f"{DOMAIN} outbox"
+            )
+        else:
+            self._wakeup.set()
+
+    @callback
+    def async_enqueue(
+        self,
+        service: str,
+        chargers: Iterable[str],
+        *,
+        card_id: str | None = None,
+        key: str | None = None,
+    ) -> dict[str, dict[str, str]]:
+        """
+        Queue the command of a service for chargers.
+
+        Returns the id of the command per charger, derived from the
+        idempotency key if one is given.
+        """
+        now = time()
+        queued = {}
+        for idx in chargers:
+            command_id = f"{key}_{idx}" if key else ulid_now()
+            if command_id not in self._commands and command_id not in self._completed:
+                self._commands[command_id] = {
+                    "id": command_id,
+                    "service": service,
+                    "charger": idx,
+                    "card": card_id,
+                    "created": now,
+                    "next_attempt": now,
+                    "attempts": 0,
+                    "error": None,
+                }
+            queued[idx] = {"queued": command_id}
+        self._async_save()
+        self.async_start()
+        return queued
+
+    async def _async_run(self) -> None:
+        """Send the commands that are due, waiting for the next one in between."""
+        while self._commands:
+            now = time()
+            due = [
+                command
+                for command in self._commands.values()
+                if command["next_attempt"] <= now
+            ]
+            if not due:
+                # Wait, unless a command is queued in the meantime
+                self._wakeup.clear()
+                next_attempt = min(
+                    command["next_attempt"] for command in self._commands.values()
+                )
+                with suppress(TimeoutError):
+                    async with asyncio.timeout(next_attempt - now):
+                        await self._wakeup.wait()
+                continue
+
+            await asyncio.gather(*(self._async_attempt(command) for command in due))
+            self._async_save()
+
+    async def _async_attempt(self, command: QueuedCommand) -> None:
+        """Send a command, completing it unless it didn't reach 50five."""
+        command["attempts"] += 1
+        try:
+            response = await self._async_send(command)
+        except FiftyfiveApiInvalidCardError:
+            self._async_complete(command, None, "Card not found")
+        except FiftyfiveApiNotSentError as exception:
+            self._async_retry(command, str(exception) or type(exception).__name__)
+        except FiftyfiveApiClientError as exception:
+            self._async_complete(
+                command,
+                None,
+                f"Unknown outcome: {str(exception) or type(exception).__name__}",
+            )
+        else:
+            self._async_complete(
+                command, response, None if response else "Rejected by 50five"
+            )
+
+    async def _async_send(self, command: QueuedCommand) -> Any:
+        """Send a command and return its response."""
+        client = self.entry.runtime_data.client
+        idx = command["charger"]
+        if command["service"] == START_CHARGE_SESSION:
+            return await client.async_start(idx, command["card"] or "")
+        action, _ = COMMANDS[command["service"]]
+        return (await client.async_send(action, [idx]))[idx]
+
+    @callback
+    def _async_retry(self, command: QueuedCommand, error: str) -> None:
+        """Send a command again after a backoff, unless it waited too long."""
+        command["error"] = error
+        if time() - command["created"] >= OUTBOX_MAX_AGE.total_seconds():
+            self._async_complete(command, None, f"Expired: {error}")
+            return
+
+        self.retries += 1
+        backoff = min(
+            BACKOFF_MIN.total_seconds() * 2 ** (command["attempts"] - 1),
+            BACKOFF_MAX.total_seconds(),
+        )
+        command["next_attempt"] = time() + max(
+            backoff, self.entry.runtime_data.client.breaker.retry_in
+        )
+        LOGGER.debug(
+            "%s on charger %s failed, retrying in %.0fs: %s",
+            command["service"],
+            command["charger"],
+            command["next_attempt"] - time(),
+            error,
+        )
+
+    @callback
+    def _async_complete(
+        self, command: QueuedCommand, response: Any, error: str | None
+    ) -> None:
+        """Remove a command from the outbox and announce its outcome."""
+        del self._commands[command["id"]]
+        self._completed[command["id"]] = time()
+        idx = command["charger"]
+        if error is None:
+            self.succeeded += 1
+            expectation = (
+                expect_charging
+                if command["service"] == START_CHARGE_SESSION
+                else COMMANDS[command["service"]][1]
+            )
+            self.entry.runtime_data.coordinator.async_confirm(expectation, idx)
+        else:
+            self.failed += 1
+            LOGGER.warning(
+                "%s on charger %s failed: %s", command["service"], idx, error
+            )
+
+        self.hass.bus.async_fire(
+            EVENT_COMMAND_COMPLETED,
+            {
+                "id": command["id"],
+                "entry_id": self.entry.entry_id,
+                "service": command["service"],
+                "charger": idx,
+                "success": error is None,
+                "response": response,
+                "error": error,
+                "attempts": command["attempts"],
+            },
+        )
+
+    @callback
+    def _async_save(self) -> None:
+        """Persist the outbox, in the same loop iteration as other changes."""
+        self._store.async_delay_save(self._data_to_save, 0)
+
+    def _data_to_save(self) -> OutboxData:
+        """Return the outbox to persist, forgetting ids that completed long ago."""
+        expired = time() - OUTBOX_ID_TTL.total_seconds()
+        self._completed = {
+            command_id: completed
+            for command_id, completed in self._completed.items()
+            if completed > expired
+        }
+        return {
+            "commands": list(self._commands.values()),
+            "completed": self._completed,
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the outbox state for diagnostics, without the cards."""
+        now = time()
+        return {
+            "depth": self.depth,
+            "oldest_age": self.oldest_age,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retries": self.retries,
+            "commands": [
+                {
+                    "service": command["service"],
+                    "charger": command["charger"],
+                    "age": now - command["created"],
+                    "attempts": command["attempts"],
+                    "error": command["error"],
+                }
+                for command in self._commands.values()
+            ],
+        }
+
+
+def outbox_key(entry_id: str) -> str:
+    """Return the storage key of the command outbox of a config entry."""
+    return f"{DOMAIN}.{entry_id}.outbox"
@@ -0,0 +1,185 @@
+"""Recording and replay of the 50five API traffic."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+from collections import defaultdict, deque
+from http.cookies import Morsel
+from time import monotonic
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.diagnostics import async_redact_data
+
+from .api import SESSION_COOKIE
+from .const import DOMAIN, LOGGER, RECORD_FLUSH_SIZE
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable
+    from pathlib import Path
+
+    from homeassistant.core import Event, HomeAssistant
+
+    from fiftyfive import Request
+
+# Never part of the API calls today, redacted should that change
+TO_REDACT = {"email", "emailField", "password", "passwordField", "EMAIL", "PASSWORD"}
+
+
+def _signature(service: str, method: str, params: dict[str, Any]) -> str:
+    """Return the key a recorded call is replayed by."""
+    return json.dumps([service, method, params], sort_keys=True)
+
+
+class TrafficRecorder:
+    """
+    Records the batches of API calls of a client to a gzipped JSONL file.
+
+    Every line holds one batch: its kind, the time it was sent in seconds since
+    the recording started, how long it took, its calls and their responses, or
+    the type of the error it failed with. Logins aren't recorded, so neither
+    are credentials or the session cookie.
+    """
+
+    def __init__(self, hass: HomeAssistant, path: str | Path) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.path = path
+        self._start = monotonic()
+        self._buffer: list[str] = []
+        self._lock = asyncio.Lock()
+
+    async def async_record(
+        self, kind: str, requests: list[Request], call: Awaitable[Any]
+    ) -> Any:
+        """Make the call of a batch of requests, recording it."""
+        start = monotonic()
+        try:
+            responses = await call
+        except Exception as exception:
+            self._record(kind, requests, start, None, type(exception).__name__)
+            raise
+        self._record(kind, requests, start, responses, None)
+        return responses
+
+    def _record(
+        self,
+        kind: str,
+        requests: list[Request],
+        start: float,
+        responses: Any,
+        error: str | None,
+    ) -> None:
+        """Buffer a batch, flushing the buffer once it is full."""
+        record = {
+            "t": round(start - self._start, 3),
+            "kind": kind,
+            "duration": round(monotonic() - start, 3),
+            "requests": [
+                {
+                    "service": request.service,
+                    "method": request.method,
+                    "params": async_redact_data(request.params, TO_REDACT),
+                }
+                for request in requests
+            ],
+            "responses": async_redact_data(responses, TO_REDACT),
+            "error": error,
+        }
+        self._buffer.append(json.dumps(record))
+        if len(self._buffer) >= RECORD_FLUSH_SIZE:
+            self.hass.async_create_background_task(
+                self.async_flush(), f"{DOMAIN} traffic recording"
+            )
+
+    async def async_flush(self, _: Event | None = None) -> None:
+        """Append the recorded batches to the file."""
+        async with self._lock:
+            lines, self._buffer = self._buffer, []
+            if lines:
+                await self.hass.async_add_executor_job(self._write, lines)
+
+    def _write(self, lines: list[str]) -> None:
+        """Append lines to the file, as a gzip member of its own."""
+        with gzip.open(self.path, "at", encoding="utf-8") as file:
+            file.writelines(f"{line}\n" for line in lines)
+
+
+class ReplayApi:
+    """
+    Stand-in for the fiftyfive Api serving a recording back.
+
+    Every call gets the next recorded response of the same call, the last one
+    repeating once they ran out. The replay is finished once it served the end
+    of the recording, or only had repeats left to serve. Batches that failed
+    fail again. Responses are held back until the time they arrived in
+    the recording, sped up by `speed`; a speed of 0 serves them right away.
+    """
+
+    def __init__(self, batches: list[dict[str, Any]], speed: float = 1.0) -> None:
+        """Initialize."""
+        self.speed = speed
+        # Per call: its recorded responses, as (arrival, response, error)
+        self._responses: defaultdict[str, deque[tuple[float, Any, str | None]]] = (
+            defaultdict(deque)
+        )
+        for batch in batches:
+            for i, request in enumerate(batch["requests"]):
+                response = batch["responses"][i] if batch["responses"] else None
+                self._responses[_signature(**request)].append(
+                    (batch["t"] + batch["duration"], response, batch["error"])
+                )
+        self.duration = max((batch["t"] for batch in batches), default=0.0)
+        self.finished = False
+        self.calls = 0
+        self._start: float | None = None
+        # Calls whose last recorded response was served
+        self._drained: set[str] = set()
+        # The client finds the session cookie through session.cookie_jar
+        self.session = self
+        self.cookie_jar: list[Morsel] = []
+
+    @classmethod
+    def load(cls, path: str | Path, speed: float = 1.0) -> ReplayApi:
+        """Load a recording, this does I/O."""
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            return cls([json.loads(line) for line in file], speed)
+
+    async def login(self) -> bool:
+        """Log in, which always succeeds."""
+        cookie: Morsel = Morsel()
+        cookie.set(SESSION_COOKIE, "replay", "replay")
+        self.cookie_jar = [cookie]
+        return True
+
+    async def make_requests(self, requests: list[Request]) -> Any:
+        """Serve the next recorded responses of the calls."""
+        if self._start is None:
+            self._start = monotonic()
+        self.calls += len(requests)
+
+        served = []
+        repeats = 0
+        for request in requests:
+            signature = _signature(request.service, request.method, request.params)
+            if not (queue := self._responses.get(signature)):
+                msg = f"{request.method} {request.params} is not in the recording"
+                raise ValueError(msg)
+            if len(queue) > 1:
+                served.append(queue.popleft())
+            else:
+                served.append(queue[0])
+                repeats += signature in self._drained
+                self._drained.add(signature)
+
+        due = max(at for at, _, _ in served)
+        if due >= self.duration or repeats == len(requests):
+            self.finished = True
+        if self.speed and (delay := self._start + due / self.speed - monotonic()) > 0:
+            await asyncio.sleep(delay)
+        if errors := [error for _, _, error in served if error]:
+            LOGGER.debug("Replaying %s", errors[0])
+            msg = f"Replayed {errors[0]}"
+            raise ValueError(msg)
+        return [response for _, response, _ in served]
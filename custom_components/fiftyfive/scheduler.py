@@ -0,0 +1,136 @@
+"""Poll scheduler shared by the 50five accounts."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from itertools import pairwise
+from time import monotonic
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import callback
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DEFAULT_UPDATE_INTERVAL, DOMAIN, MAX_CONCURRENT_REFRESHES
+from .metrics import LatencyHistogram
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
+
+    from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+
+DATA_SCHEDULER: HassKey[PollScheduler] = HassKey(f"{DOMAIN}.scheduler")
+
+
+class PollScheduler:
+    """
+    Spreads the full refreshes of all accounts over the polling interval.
+
+    Every account gets its own slot, an even share of the interval, and full
+    refreshes are scheduled in it. Fast polls of charging chargers keep their
+    own pace. At most MAX_CONCURRENT_REFRESHES accounts send polling requests
+    at once.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize."""
+        self.hass = hass
+        self._accounts: list[str] = []
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENT_REFRESHES)
+        # Requests in flight per account holding a refresh slot
+        self._holders: Counter[str] = Counter()
+        self._acquiring: defaultdict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        # Loop time at which the last full refresh of each account started
+        self._starts: dict[str, float] = {}
+        self.running = 0
+        self.max_running = 0
+        self.waits = LatencyHistogram()
+
+    @callback
+    def async_register(self, entry_id: str) -> CALLBACK_TYPE:
+        """Give an account a slot, until the returned callback is called."""
+        self._accounts.append(entry_id)
+
+        @callback
+        def _async_unregister() -> None:
+            self._accounts.remove(entry_id)
+            self._starts.pop(entry_id, None)
+            self._acquiring.pop(entry_id, None)
+
+        return _async_unregister
+
+    def phase(self, entry_id: str) -> float:
+        """Return where the slot of an account starts, as a share of the interval."""
+        return self._accounts.index(entry_id) / len(self._accounts)
+
+    def delay(self, entry_id: str, interval: float) -> float:
+        """
+        Return the seconds until the next full refresh of an account.
+
+        That's the interval moved to the start of the slot of the account: back
+        if it falls within the slot, which keeps refreshes from drifting out of
+        it, else forward to the next start of the slot.
+        """
+        due = self.hass.loop.time() + interval
+        late = (due - self.phase(entry_id) * interval) % interval
+        if late < interval / len(self._accounts):
+            return interval - late
+        return 2 * interval - late
+
+    @callback
+    def async_refresh_started(self, entry_id: str) -> None:
+        """Record the start of a full refresh of an account."""
+        if entry_id in self._accounts:
+            self._starts[entry_id] = self.hass.loop.time()
+
+    @asynccontextmanager
+    async def async_slot(self, entry_id: str) -> AsyncGenerator[None]:
+        """
+        Hold one of the refresh slots while an account sends a request.
+
+        Concurrent requests of an account share its slot, which is released as
+        soon as none is in flight, so waiting for the call budget doesn't hold
+        it.
+        """
+        async with self._acquiring[entry_id]:
+            if not self._holders[entry_id]:
+                start = monotonic()
+                await self._semaphore.acquire()
+                self.waits.record(monotonic() - start)
+                self.running += 1
+                self.max_running = max(self.max_running, self.running)
+            self._holders[entry_id] += 1
+        try:
+            yield
+        finally:
+            self._holders[entry_id] -= 1
+            if not self._holders[entry_id]:
+                del self._holders[entry_id]
+                self.running -= 1
+                self._semaphore.release()
+
+    def evenness(self) -> float | None:
+        """
+        Return how evenly the last full refreshes are spread over the interval.
+
+        That's the smallest gap between two of them relative to an even share
+        of the interval: 1 when evenly spread, 0 when in lockstep.
+        """
+        if len(self._starts) < 2:  # noqa: PLR2004
+            return None
+        interval = DEFAULT_UPDATE_INTERVAL.total_seconds()
+        offsets = sorted(start % interval for start in self._starts.values())
+        gaps = [b - a for a, b in pairwise(offsets)]
+        gaps.append(offsets[0] + interval - offsets[-1])
+        return min(gaps) * len(offsets) / interval
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the scheduler state for diagnostics."""
+        return {
+            "accounts": len(self._accounts),
+            "evenness": self.evenness(),
+            "running": self.running,
+            "max_running": self.max_running,
+            "waits": self.waits.as_dict(),
+        }
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -11,33 +11,47 @@ from homeassistant.components.sensor import (
     SensorEntityDescription,
     SensorStateClass,
 )
-from homeassistant.const import UnitOfEnergy, UnitOfPower, UnitOfTime
+from homeassistant.const import (
+    EntityCategory,
+    UnitOfEnergy,
+    UnitOfInformation,
+    UnitOfPower,
+    UnitOfTime,
+)
 
-from .entity import FiftyfiveEntity
+from .entity import (
+    FiftyfiveAccountEntity,
+    FiftyfiveEntity,
+    async_add_charger_entities,
+)
 
 if TYPE_CHECKING:
     from collections.abc import Callable
 
     from homeassistant.core import HomeAssistant
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
+    from homeassistant.helpers.typing import StateType
 
     from .coordinator import FiftyfiveDataUpdateCoordinator
-    from .data import FiftyfiveConfigEntry
+    from .data import ChargerState, FiftyfiveConfigEntry
 
 
 @dataclass(frozen=True, kw_only=True)
 class FiftyfiveSensorEntityDescription(SensorEntityDescription):
     """Class describing 50five sensor entities."""
 
-    value_fn: Callable
+    value_fn: Callable[[ChargerState], StateType]
+    fields: tuple[str, ...]
 
 
-def hm_to_m(value: str) -> int:
-    """Convert hh:mm duration into minutes."""
-    if not value:
-        return 0
-    hours, minutes = map(int, value.split(":"))
-    return 60 * hours + minutes
+@dataclass(frozen=True, kw_only=True)
+class FiftyfiveAccountSensorEntityDescription(SensorEntityDescription):
+    """Class describing 50five account sensor entities."""
+
+    value_fn: Callable[[FiftyfiveDataUpdateCoordinator], Any]
+    attributes_fn: Callable[[FiftyfiveDataUpdateCoordinator], dict] | None = None
+    entity_category: EntityCategory | None = EntityCategory.DIAGNOSTIC
+    entity_registry_enabled_default: bool = False
 
 
 ENTITY_DESCRIPTIONS = (
@@ -47,7 +61,8 @@ ENTITY_DESCRIPTIONS = (
         native_unit_of_measurement=UnitOfPower.KILO_WATT,
         device_class=SensorDeviceClass.POWER,
         state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda network: network["MOM_POWER_KW"] or 0,
+        value_fn=lambda state: state.power_kw,
+        fields=("power_kw",),
     ),
     FiftyfiveSensorEntityDescription(
         key="transaction_energy_delivered",
@@ -55,7 +70,8 @@ ENTITY_DESCRIPTIONS = (
         native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
         device_class=SensorDeviceClass.ENERGY,
         state_class=SensorStateClass.TOTAL,
-        value_fn=lambda network: network["TRANS_ENERGY_DELIVERED_KWH"] or 0,
+        value_fn=lambda state: state.energy_kwh,
+        fields=("energy_kwh",),
     ),
     FiftyfiveSensorEntityDescription(
         key="transaction_duration",
@@ -63,17 +79,98 @@ ENTITY_DESCRIPTIONS = (
         native_unit_of_measurement=UnitOfTime.MINUTES,
         device_class=SensorDeviceClass.DURATION,
         state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda network: hm_to_m(network["TRANSACTION_TIME_H_M"]),
+        value_fn=lambda state: state.duration_min,
+        fields=("duration_min",),
     ),
     FiftyfiveSensorEntityDescription(
         key="transaction_card",
         translation_key="transaction_card",
-        value_fn=lambda network: network["CARDID"],
+        value_fn=lambda state: state.card,
+        fields=("card",),
     ),
     FiftyfiveSensorEntityDescription(
         key="status",
         translation_key="status",
-        value_fn=lambda network: network["NOTIFICATION"],
+        value_fn=lambda state: state.notification,
+        fields=("notification",),
+    ),
+)
+
+
+def _latency_sensor(kind: str) -> FiftyfiveAccountSensorEntityDescription:
+    """Describe the sensor of the latency of one kind of API request."""
+    return FiftyfiveAccountSensorEntityDescription(
+        key=f"{kind}_latency",
+        translation_key=f"{kind}_latency",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=3,
+        value_fn=lambda coordinator: (
+            coordinator.config_entry.runtime_data.client.metrics.latency[kind].last
+        ),
+        attributes_fn=lambda coordinator: (
+            coordinator.config_entry.runtime_data.client.metrics.latency[kind].as_dict()
+        ),
+    )
+
+
+ACCOUNT_ENTITY_DESCRIPTIONS = (
+    FiftyfiveAccountSensorEntityDescription(
+        key="refresh_duration",
+        translation_key="refresh_duration",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=3,
+        value_fn=lambda coordinator: coordinator.refresh_duration,
+        attributes_fn=lambda coordinator: coordinator.refresh_phases,
+    ),
+    FiftyfiveAccountSensorEntityDescription(
+        key="refresh_calls",
+        translation_key="refresh_calls",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: coordinator.refresh_calls,
+    ),
+    FiftyfiveAccountSensorEntityDescription(
+        key="api_errors",
+        translation_key="api_errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: (
+            coordinator.config_entry.runtime_data.client.metrics.errors.total()
+        ),
+        attributes_fn=lambda coordinator: dict(
+            coordinator.config_entry.runtime_data.client.metrics.errors
+        ),
+    ),
+    FiftyfiveAccountSensorEntityDescription(
+        key="data_received",
+        translation_key="data_received",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        suggested_unit_of_measurement=UnitOfInformation.KIBIBYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: (
+            coordinator.config_entry.runtime_data.client.metrics.bytes_received
+        ),
+    ),
+    *(_latency_sensor(kind) for kind in ("login", "networks", "overviews", "commands")),
+    FiftyfiveAccountSensorEntityDescription(
+        key="outbox_depth",
+        translation_key="outbox_depth",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: coordinator.config_entry.runtime_data.outbox.depth,
+    ),
+    FiftyfiveAccountSensorEntityDescription(
+        key="outbox_age",
+        translation_key="outbox_age",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        value_fn=lambda coordinator: (
+            coordinator.config_entry.runtime_data.outbox.oldest_age
+        ),
     ),
 )
 
@@ -84,17 +181,25 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the sensor platform."""
-    entities: list = [
-        FiftyfiveChargerSensor(
+    async_add_charger_entities(
+        entry,
+        async_add_entities,
+        lambda idx: (
+            FiftyfiveChargerSensor(
+                coordinator=entry.runtime_data.coordinator,
+                entity_description=entity_description,
+                idx=idx,
+            )
+            for entity_description in ENTITY_DESCRIPTIONS
+        ),
+    )
+    async_add_entities(
+        FiftyfiveAccountSensor(
             coordinator=entry.runtime_data.coordinator,
             entity_description=entity_description,
-            idx=network["IDX"],
         )
-        for entity_description in ENTITY_DESCRIPTIONS
-        for network in entry.runtime_data.coordinator.data
-    ]
-
-    async_add_entities(entities)
+        for entity_description in ACCOUNT_ENTITY_DESCRIPTIONS
+    )
 
 
 class FiftyfiveChargerSensor(FiftyfiveEntity, SensorEntity):
@@ -103,15 +208,45 @@ class FiftyfiveChargerSensor(FiftyfiveEntity, SensorEntity):
     def __init__(
         self,
         coordinator: FiftyfiveDataUpdateCoordinator,
-        entity_description: SensorEntityDescription,
+        entity_description: FiftyfiveSensorEntityDescription,
         idx: str,
     ) -> None:
         """Initialize the sensor class."""
-        super().__init__(coordinator, idx)
+        super().__init__(coordinator, idx, entity_description.fields)
         self.entity_description = entity_description
         self._attr_unique_id = f"{idx}_{entity_description.key}"
 
     @property
-    def native_value(self) -> str | None:
+    def native_value(self) -> StateType:
         """Return the native value of the sensor."""
-        return self.entity_description.value_fn(self.network)
+        return self.entity_description.value_fn(self.charger)
+
+
+class FiftyfiveAccountSensor(FiftyfiveAccountEntity, SensorEntity):
+    """Fiftyfive diagnostic sensor of the account."""
+
+    entity_description: FiftyfiveAccountSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: FiftyfiveDataUpdateCoordinator,
+        entity_description: FiftyfiveAccountSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor class."""
+        super().__init__(coordinator)
+        self.entity_description = entity_description
+        self._attr_unique_id = (
+            f"{coordinator.config_entry.entry_id}_{entity_description.key}"
+        )
+
+    @property
+    def native_value(self) -> Any:
+        """Return the native value of the sensor."""
+        return self.entity_description.value_fn(self.coordinator)
+
+    @property
+    def extra_state_attributes(self) -> dict | None:
+        """Return the breakdown of the value, if any."""
+        if self.entity_description.attributes_fn is None:
+            return None
+        return self.entity_description.attributes_fn(self.coordinator)
@@ -2,20 +2,49 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from dataclasses import asdict
+from typing import TYPE_CHECKING, Any
 
+from homeassistant.core import callback
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.target import (
+    TargetSelection,
+    async_extract_referenced_entity_ids,
+)
+from homeassistant.util.hass_dict import HassKey
 
+from fiftyfive import Block, HardReset, SoftReset, Stop, Unblock, UnlockConnector
+
+from .api import FiftyfiveApiClientError
 from .const import DOMAIN, LOGGER
+from .coordinator import (
+    REFRESH_CONTEXT,
+    expect_change,
+    expect_charging,
+    expect_idle,
+)
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Awaitable, Callable
+
+    from homeassistant.core import (
+        CALLBACK_TYPE,
+        Event,
+        HomeAssistant,
+        ServiceCall,
+        ServiceResponse,
+    )
 
-    from homeassistant.core import HomeAssistant, ServiceCall
+    from fiftyfive import Action, Channel
 
     from .api import FiftyfiveApiClient
+    from .coordinator import Expectation
     from .data import FiftyfiveConfigEntry
 
+DATA_SERVICE_HANDLER: HassKey[ChargerServiceHandler] = HassKey(DOMAIN)
+
 
 class ChargerServiceHandler:
     """Handles all service calls."""
@@ -23,152 +52,271 @@ class ChargerServiceHandler:
     def __init__(self, hass: HomeAssistant) -> None:
         """Initialize."""
         self.hass = hass
-
-    async def _find_charger_idx(self, device_id: str) -> str | None:
+        # Routing indexes, so a service call doesn't scan every account
+        self._entries: dict[str, FiftyfiveConfigEntry] = {}
+        self._chargers: dict[str, frozenset[str]] = {}
+        self._devices: dict[str, str] = {}
+
+    @callback
+    def async_track_entry(self, entry: FiftyfiveConfigEntry) -> CALLBACK_TYPE:
+        """
+        Route the chargers of a config entry to it, following its coordinator.
+
+        Returns a callback that stops routing to the entry.
+        """
+        coordinator = entry.runtime_data.coordinator
+
+        @callback
+        def _async_update() -> None:
+            chargers = coordinator.data.keys()
+            known = self._chargers.get(entry.entry_id, frozenset())
+            if chargers == known:
+                return
+            for idx in known.difference(chargers):
+                if self._entries.get(idx) is entry:
+                    del self._entries[idx]
+            self._entries.update(dict.fromkeys(chargers - known, entry))
+            self._chargers[entry.entry_id] = frozenset(chargers)
+
+        @callback
+        def _async_untrack() -> None:
+            remove_listener()
+            for idx in self._chargers.pop(entry.entry_id, ()):
+                if self._entries.get(idx) is entry:
+                    del self._entries[idx]
+
+        _async_update()
+        remove_listener = coordinator.async_add_listener(
+            _async_update, context=REFRESH_CONTEXT
+        )
+        return _async_untrack
+
+    @callback
+    def async_device_updated(
+        self, event: Event[dr.EventDeviceRegistryUpdatedData]
+    ) -> None:
+        """Forget the charger of a device that was updated or removed."""
+        if event.data["action"] != "create":
+            self._devices.pop(event.data["device_id"], None)
+
+    async def _find_charger_idx(
+        self, device_id: str, *, warn: bool = True
+    ) -> str | None:
         """Find charger idx based on device id."""
+        if idx := self._devices.get(device_id):
+            return idx
+
         device_registry = dr.async_get(self.hass)
 
         device = device_registry.async_get(device_id)
         if not device:
-            LOGGER.warning("Device %s not found", device_id)
+            if warn:
+                LOGGER.warning("Device %s not found", device_id)
             return None
 
         identifier = next(iter(device.identifiers), None)
         if not identifier or identifier[0] != DOMAIN:
-            LOGGER.warning("Device %s does not belong to %s", device_id, DOMAIN)
+            if warn:
+                LOGGER.warning("Device %s does not belong to %s", device_id, DOMAIN)
             return None
 
+        self._devices[device_id] = identifier[1]
         return identifier[1]
 
-    async def _do_action_on_device(self, device_id: str, action: Callable) -> None:
-        """."""
-        idx = await self._find_charger_idx(device_id)
-        if not idx:
-            return
-
-        for entry in self.hass.config_entries.async_entries(DOMAIN):
-            networks = entry.runtime_data.coordinator.data
-            if any(charger["IDX"] == idx for charger in networks):
-                client = entry.runtime_data.client
-                await action(entry, client, idx)
-                break
-        else:
-            LOGGER.warning("No config entry found for charger %s", idx)
-
-    async def handle_soft_reset(self, call: ServiceCall) -> None:
-        """Handle the soft_reset_charger service call."""
-        device_id = call.data.get("device", None)
-
-        if not device_id:
-            LOGGER.error("No device selected for soft_reset_charger")
-            return
+    async def _find_chargers(
+        self, call: ServiceCall
+    ) -> dict[str, tuple[FiftyfiveConfigEntry, list[str]]]:
+        """
+        Find the chargers targeted by a service call, grouped by config entry.
+
+        Devices can be given through the `device` field or as a target, in which
+        case areas, floors and labels are expanded to the chargers they contain.
+        """
+        devices = dict.fromkeys(cv.ensure_list(call.data.get("device")), True)
+
+        selected = async_extract_referenced_entity_ids(
+            self.hass, TargetSelection(call.data)
+        )
+        entity_registry = er.async_get(self.hass)
+        for entity_id in selected.referenced:
+            entity = entity_registry.async_get(entity_id)
+            if entity and entity.device_id:
+                devices.setdefault(entity.device_id, True)
+        for device_id in selected.referenced_devices:
+            devices.setdefault(device_id, False)
+
+        groups: dict[str, tuple[FiftyfiveConfigEntry, list[str]]] = {}
+        for device_id, explicit in devices.items():
+            idx = await self._find_charger_idx(device_id, warn=explicit)
+            if not idx:
+                continue
+
+            entry = self._entries.get(idx)
+            if entry is None:
+                LOGGER.warning("No config entry found for charger %s", idx)
+                continue
+            groups.setdefault(entry.entry_id, (entry, []))[1].append(idx)
+        return groups
+
+    async def _do_action_on_chargers(
+        self,
+        call: ServiceCall,
+        action: Callable[
+            [FiftyfiveConfigEntry, FiftyfiveApiClient, list[str]], Awaitable[dict]
+        ],
+    ) -> ServiceResponse:
+        """
+        Run an action on the targeted chargers, once per config entry.
+
+        Returns the result of the action per charger. An action can fail as a
+        whole by raising, or per charger by returning the error of a charger.
+        """
+        groups = await self._find_chargers(call)
+        if not groups:
+            LOGGER.error("No charger selected for %s", call.service)
+            return {"chargers": {}}
+
+        results: dict[str, Any] = {}
+        for entry, chargers in groups.values():
+            try:
+                responses = await action(entry, entry.runtime_data.client, chargers)
+            except FiftyfiveApiClientError as exception:
+                LOGGER.warning("%s failed on %s: %s", call.service, chargers, exception)
+                responses = {}
+                error = str(exception) or type(exception).__name__
+            else:
+                error = "Rejected by 50five"
+
+            for idx in chargers:
+                response = responses.get(idx)
+                if isinstance(response, FiftyfiveApiClientError):
+                    LOGGER.warning("%s failed on %s: %s", call.service, idx, response)
+                    results[idx] = {
+                        "success": False,
+                        "error": str(response) or type(response).__name__,
+                    }
+                elif response:
+                    results[idx] = {"success": True, "response": response}
+                else:
+                    results[idx] = {"success": False, "error": error}
+        return {"chargers": results}
+
+    async def _send_command(
+        self,
+        call: ServiceCall,
+        command: Callable[[Channel], Action],
+        message: str,
+        expectation: Expectation = expect_change,
+    ) -> ServiceResponse:
+        """Send a command to the targeted chargers and confirm its outcome."""
+        if call.data.get("queue"):
+            return await self._queue_command(call)
 
         async def action(
-            _: FiftyfiveConfigEntry, client: FiftyfiveApiClient, idx: str
-        ) -> None:
-            LOGGER.info("Soft resetting charger %s", idx)
-            await client.async_soft_reset(charger=idx)
-
-        await self._do_action_on_device(device_id=device_id, action=action)
-
-    async def handle_hard_reset(self, call: ServiceCall) -> None:
-        """Handle the hard_reset_charger service call."""
-        device_id = call.data.get("device", None)
-
-        if not device_id:
-            LOGGER.error("No device selected for hard_reset_charger")
-            return
+            entry: FiftyfiveConfigEntry,
+            client: FiftyfiveApiClient,
+            chargers: list[str],
+        ) -> dict:
+            LOGGER.info(message, ", ".join(chargers))
+            responses = await client.async_send(command, chargers)
+            entry.runtime_data.coordinator.async_confirm(
+                expectation, *(idx for idx, response in responses.items() if response)
+            )
+            return responses
+
+        return await self._do_action_on_chargers(call, action)
+
+    async def _queue_command(
+        self, call: ServiceCall, card_id: str | None = None
+    ) -> ServiceResponse:
+        """Queue the command of a service call in the outbox of each account."""
 
         async def action(
-            _: FiftyfiveConfigEntry, client: FiftyfiveApiClient, idx: str
-        ) -> None:
-            LOGGER.info("Hard resetting charger %s", idx)
-            await client.async_hard_reset(charger=idx)
+            entry: FiftyfiveConfigEntry,
+            _: FiftyfiveApiClient,
+            chargers: list[str],
+        ) -> dict:
+            LOGGER.info("Queueing %s on chargers %s", call.service, ", ".join(chargers))
+            return entry.runtime_data.outbox.async_enqueue(
+                call.service,
+                chargers,
+                card_id=card_id,
+                key=call.data.get("idempotency_key"),
+            )
+
+        return await self._do_action_on_chargers(call, action)
+
+    async def handle_soft_reset(self, call: ServiceCall) -> ServiceResponse:
+        """Handle the soft_reset_charger service call."""
+        return await self._send_command(call, SoftReset, "Soft resetting chargers %s")
 
-        await self._do_action_on_device(device_id=device_id, action=action)
+    async def handle_hard_reset(self, call: ServiceCall) -> ServiceResponse:
+        """Handle the hard_reset_charger service call."""
+        return await self._send_command(call, HardReset, "Hard resetting chargers %s")
 
-    async def handle_unlock(self, call: ServiceCall) -> None:
+    async def handle_unlock(self, call: ServiceCall) -> ServiceResponse:
         """Handle the unlock_connector service call."""
-        device_id = call.data.get("device", None)
-
-        if not device_id:
-            LOGGER.error("No device selected for unlock_connector")
-            return
-
-        async def action(
-            _: FiftyfiveConfigEntry, client: FiftyfiveApiClient, idx: str
-        ) -> None:
-            LOGGER.info("Unlocking connector from charger %s", idx)
-            await client.async_unlock_connector(charger=idx)
+        return await self._send_command(
+            call, UnlockConnector, "Unlocking connector from chargers %s"
+        )
 
-        await self._do_action_on_device(device_id=device_id, action=action)
-
-    async def handle_block(self, call: ServiceCall) -> None:
+    async def handle_block(self, call: ServiceCall) -> ServiceResponse:
         """Handle the block_charger service call."""
-        device_id = call.data.get("device", None)
-
-        if not device_id:
-            LOGGER.error("No device selected for block_charger")
-            return
-
-        async def action(
-            _: FiftyfiveConfigEntry, client: FiftyfiveApiClient, idx: str
-        ) -> None:
-            LOGGER.info("Blocking charger %s", idx)
-            await client.async_block(charger=idx)
+        return await self._send_command(call, Block, "Blocking chargers %s")
 
-        await self._do_action_on_device(device_id=device_id, action=action)
-
-    async def handle_unblock(self, call: ServiceCall) -> None:
+    async def handle_unblock(self, call: ServiceCall) -> ServiceResponse:
         """Handle the unblock_charger service call."""
-        device_id = call.data.get("device", None)
-
-        if not device_id:
-            LOGGER.error("No device selected for unblock_charger")
-            return
-
-        async def action(
-            _: FiftyfiveConfigEntry, client: FiftyfiveApiClient, idx: str
-        ) -> None:
-            LOGGER.info("Unblocking charger %s", idx)
-            await client.async_block(charger=idx)
+        return await self._send_command(call, Unblock, "Unblocking chargers %s")
 
-        await self._do_action_on_device(device_id=device_id, action=action)
-
-    async def handle_stop(self, call: ServiceCall) -> None:
+    async def handle_stop(self, call: ServiceCall) -> ServiceResponse:
         """Handle the stop_charge_session service call."""
-        device_id = call.data.get("device", None)
-
-        if not device_id:
-            LOGGER.error("No device selected for stop_charge_session")
-            return
-
-        async def action(
-            _: FiftyfiveConfigEntry, client: FiftyfiveApiClient, idx: str
-        ) -> None:
-            LOGGER.info("Stopping charge session on charger %s", idx)
-            await client.async_stop(charger=idx)
+        return await self._send_command(
+            call, Stop, "Stopping charge session on chargers %s", expect_idle
+        )
 
-        await self._do_action_on_device(device_id=device_id, action=action)
-
-    async def handle_start(self, call: ServiceCall) -> None:
+    async def handle_start(self, call: ServiceCall) -> ServiceResponse:
         """Handle the start_charge_session service call."""
-        device_id = call.data.get("device", None)
         card_id = call.data.get("card", None)
 
-        if not device_id:
-            LOGGER.error("No device selected for start_charge_session")
-            return
-
         if not card_id:
             LOGGER.error("No card selected for start_charge_session")
-            return
+            return {"chargers": {}}
+        if call.data.get("queue"):
+            return await self._queue_command(call, card_id)
 
         async def action(
-            entry: FiftyfiveConfigEntry, client: FiftyfiveApiClient, idx: str
-        ) -> None:
-            LOGGER.info("Starting charge session on charger %s", idx)
-            await client.async_start(charger=idx, card_id=card_id)
-            await entry.runtime_data.coordinator.start_fast_polling()
+            entry: FiftyfiveConfigEntry,
+            client: FiftyfiveApiClient,
+            chargers: list[str],
+        ) -> dict:
+            LOGGER.info("Starting charge session on chargers %s", ", ".join(chargers))
+            results = await client.async_start_many(chargers, card_id=card_id)
+            for idx in chargers:
+                if idx not in results:
+                    LOGGER.warning("Card %s not found on charger %s", card_id, idx)
+            entry.runtime_data.coordinator.async_confirm(
+                expect_charging,
+                *(
+                    idx
+                    for idx, result in results.items()
+                    if result and not isinstance(result, FiftyfiveApiClientError)
+                ),
+            )
+            return results
+
+        return await self._do_action_on_chargers(call, action)
+
+    async def handle_refresh(self, call: ServiceCall) -> ServiceResponse:
+        """Handle the refresh_charger service call."""
 
-        await self._do_action_on_device(device_id=device_id, action=action)
+        async def action(
+            entry: FiftyfiveConfigEntry,
+            _: FiftyfiveApiClient,
+            chargers: list[str],
+        ) -> dict:
+            states = await entry.runtime_data.coordinator.async_refresh_chargers(
+                *chargers
+            )
+            return {idx: asdict(state) for idx, state in states.items()}
+
+        return await self._do_action_on_chargers(call, action)
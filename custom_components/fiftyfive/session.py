@@ -0,0 +1,80 @@
+"""HTTP connection pool to 50five."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import callback
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.util import ssl as ssl_util
+from homeassistant.util.hass_dict import HassKey
+
+from .const import (
+    DOMAIN,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_CONNECTIONS,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_KEEPALIVE,
+    HTTP_TIMEOUT,
+)
+from .metrics import ConnectionStats
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+DATA_HTTP: HassKey[FiftyfiveHttp] = HassKey(f"{DOMAIN}.http")
+
+
+@callback
+def async_get_http(hass: HomeAssistant) -> FiftyfiveHttp:
+    """Return the connection pool to 50five, creating it on first use."""
+    if (http := hass.data.get(DATA_HTTP)) is None:
+        http = hass.data[DATA_HTTP] = FiftyfiveHttp()
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, http.async_close)
+    return http
+
+
+class FiftyfiveHttp:
+    """
+    Connection pool to 50five, shared by all accounts and the config flow.
+
+    Every account gets a session of its own, for its own login cookie, on one
+    connector. Connections are kept alive between the polls of charging
+    chargers and lookups of the 50five host are cached, so fast polling
+    reuses an open connection instead of setting up a new TLS connection
+    every time.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._connector: aiohttp.TCPConnector | None = None
+        self.stats = ConnectionStats()
+
+    @callback
+    def async_create_session(self) -> aiohttp.ClientSession:
+        """Create a session on the pool, to be closed by the caller."""
+        if self._connector is None or self._connector.closed:
+            self._connector = aiohttp.TCPConnector(
+                limit=HTTP_CONNECTIONS,
+                keepalive_timeout=HTTP_KEEPALIVE.total_seconds(),
+                ttl_dns_cache=int(HTTP_DNS_CACHE_TTL.total_seconds()),
+                ssl=ssl_util.client_context(),
+            )
+        return aiohttp.ClientSession(
+            connector=self._connector,
+            connector_owner=False,
+            cookie_jar=aiohttp.CookieJar(),
+            headers={aiohttp.hdrs.USER_AGENT: SERVER_SOFTWARE},
+            timeout=aiohttp.ClientTimeout(
+                total=HTTP_TIMEOUT.total_seconds(),
+                connect=HTTP_CONNECT_TIMEOUT.total_seconds(),
+            ),
+            trace_configs=[self.stats.trace_config],
+        )
+
+    async def async_close(self, *_: Any) -> None:
+        """Close the pooled connections."""
+        if self._connector is not None:
+            await self._connector.close()
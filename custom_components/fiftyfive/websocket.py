@@ -0,0 +1,298 @@
+"""Websocket API for 50five."""
+
+from __future__ import annotations
+
+from functools import partial
+from time import monotonic
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+from homeassistant.components import websocket_api
+from homeassistant.config_entries import (
+    SIGNAL_CONFIG_ENTRY_CHANGED,
+    ConfigEntryChange,
+    ConfigEntryState,
+)
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.event import async_call_later
+
+from .const import DOMAIN
+from .coordinator import REFRESH_CONTEXT
+from .data import CHARGER_STATE_FIELDS
+
+if TYPE_CHECKING:
+    from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+
+    from .coordinator import FiftyfiveDataUpdateCoordinator
+    from .data import ChargerState, FiftyfiveConfigEntry
+
+# Fields sent per charger, the charger id being the key already
+STREAM_FIELDS = tuple(field for field in CHARGER_STATE_FIELDS if field != "idx")
+
+
+@callback
+def async_setup(hass: HomeAssistant) -> None:
+    """Register the websocket commands."""
+    websocket_api.async_register_command(hass, websocket_subscribe)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/subscribe",
+        vol.Optional("entry_id"): str,
+        vol.Optional("throttle", default=0): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+    }
+)
+@callback
+def websocket_subscribe(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """
+    Subscribe to the chargers of one account, or of all of them.
+
+    Sends a snapshot of the chargers, then only the fields that changed per
+    charger, at most once every `throttle` seconds. Accounts are followed as
+    they are loaded, reloaded and unloaded.
+    """
+    if "entry_id" in msg and not any(
+        entry.entry_id == msg["entry_id"]
+        for entry in hass.config_entries.async_loaded_entries(DOMAIN)
+    ):
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, "Config entry not loaded"
+        )
+        return
+
+    stream = _ChargerStream(
+        hass, connection, msg["id"], msg.get("entry_id"), msg["throttle"]
+    )
+    connection.subscriptions[msg["id"]] = stream.async_start()
+    connection.send_result(msg["id"])
+    stream.async_send_snapshot()
+
+
+class _ChargerStream:
+    """Charger data sent to one subscriber, as deltas to what it has."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        connection: websocket_api.ActiveConnection,
+        msg_id: int,
+        entry_id: str | None,
+        throttle: float,
+    ) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.connection = connection
+        self.msg_id = msg_id
+        self.entry_id = entry_id
+        self.throttle = throttle
+        # Followed accounts by entry id, None while not loaded
+        self.coordinators: dict[str, FiftyfiveDataUpdateCoordinator | None] = {}
+        self._unsubs: dict[str, list[CALLBACK_TYPE]] = {}
+        # What the subscriber has, and the account of every charger
+        self._sent: dict[str, ChargerState] = {}
+        self._owner: dict[str, str] = {}
+        self._available: dict[str, bool] = {}
+        # Chargers that may have changed since the last message, by account
+        self._dirty: dict[str, str] = {}
+        self._check_removed = False
+        self._last_flush = 0.0
+        self._unsub_flush: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Follow the accounts, until the returned callback is called."""
+        for entry in self.hass.config_entries.async_loaded_entries(DOMAIN):
+            if self.entry_id in (None, entry.entry_id):
+                self._async_follow(entry)
+        unsub_entries = async_dispatcher_connect(
+            self.hass, SIGNAL_CONFIG_ENTRY_CHANGED, self._async_entry_changed
+        )
+
+        @callback
+        def _async_stop() -> None:
+            unsub_entries()
+            for entry_id in list(self._unsubs):
+                self._async_unfollow(entry_id)
+            if self._unsub_flush:
+                self._unsub_flush()
+                self._unsub_flush = None
+
+        return _async_stop
+
+    @callback
+    def _async_follow(self, entry: FiftyfiveConfigEntry) -> None:
+        """Follow the coordinator of a loaded account."""
+        coordinator = entry.runtime_data.coordinator
+        self.coordinators[entry.entry_id] = coordinator
+        self._unsubs[entry.entry_id] = [
+            coordinator.async_add_listener(
+                partial(self._async_changed, entry.entry_id)
+            ),
+            coordinator.async_add_listener(
+                self._async_refreshed, context=REFRESH_CONTEXT
+            ),
+        ]
+
+    @callback
+    def _async_unfollow(self, entry_id: str) -> None:
+        """Stop following the coordinator of an account."""
+        for unsub in self._unsubs.pop(entry_id, ()):
+            unsub()
+
+    @callback
+    def _async_entry_changed(
+        self, change: ConfigEntryChange, entry: FiftyfiveConfigEntry
+    ) -> None:
+        """
+        Follow an account to its new coordinator when it is (re)loaded.
+
+        While an account isn't loaded its chargers are kept, and reported
+        unavailable. Once it is removed they are reported removed, and a
+        subscription to that account alone ends with an error.
+        """
+        if entry.domain != DOMAIN or self.entry_id not in (None, entry.entry_id):
+            return
+        entry_id = entry.entry_id
+        if change is ConfigEntryChange.REMOVED:
+            self._async_unfollow(entry_id)
+            self.coordinators.pop(entry_id, None)
+            if self.entry_id is not None:
+                self.connection.subscriptions.pop(self.msg_id)()
+                self.connection.send_error(
+                    self.msg_id, websocket_api.ERR_NOT_FOUND, "Config entry removed"
+                )
+                return
+            self._check_removed = True
+        elif entry.state is ConfigEntryState.LOADED:
+            coordinator = entry.runtime_data.coordinator
+            if self.coordinators.get(entry_id) is coordinator:
+                return
+            self._async_unfollow(entry_id)
+            self._async_follow(entry)
+            # Sent as changes to what the subscriber has from before the reload
+            self._dirty.update(dict.fromkeys(coordinator.data or {}, entry_id))
+            self._check_removed = True
+        elif entry_id in self._unsubs:
+            self._async_unfollow(entry_id)
+            self.coordinators[entry_id] = None
+        else:
+            return
+        self._async_schedule_flush()
+
+    @callback
+    def async_send_snapshot(self) -> None:
+        """Send all chargers, as lists of the values of STREAM_FIELDS."""
+        chargers = {}
+        for entry_id, coordinator in self.coordinators.items():
+            if coordinator is None:
+                continue
+            for idx, state in (coordinator.data or {}).items():
+                chargers[idx] = [getattr(state, field) for field in STREAM_FIELDS]
+                self._sent[idx] = state
+                self._owner[idx] = entry_id
+        self._available = self._availability()
+        self._last_flush = monotonic()
+        self.connection.send_message(
+            websocket_api.event_message(
+                self.msg_id,
+                {
+                    "fields": STREAM_FIELDS,
+                    "chargers": chargers,
+                    "available": self._available,
+                },
+            )
+        )
+
+    @callback
+    def _async_changed(self, entry_id: str) -> None:
+        """Note the chargers that changed in a coordinator update."""
+        if (coordinator := self.coordinators.get(entry_id)) is not None:
+            self._dirty.update(dict.fromkeys(coordinator.changed_chargers, entry_id))
+            self._async_schedule_flush()
+
+    @callback
+    def _async_refreshed(self) -> None:
+        """Look for removed chargers and availability changes after a refresh."""
+        self._check_removed = True
+        self._async_schedule_flush()
+
+    @callback
+    def _async_schedule_flush(self) -> None:
+        """Send the changes now, or once the throttle allows it."""
+        if self._unsub_flush:
+            return
+        delay = self._last_flush + self.throttle - monotonic()
+        if delay <= 0:
+            self._async_flush()
+        else:
+            self._unsub_flush = async_call_later(self.hass, delay, self._async_flush)
+
+    @callback
+    def _async_flush(self, *_: Any) -> None:
+        """Send the fields that changed per charger since the last message."""
+        self._unsub_flush = None
+        self._last_flush = monotonic()
+        dirty, self._dirty = self._dirty, {}
+
+        event: dict[str, Any] = {}
+        changed = {}
+        for idx, entry_id in dirty.items():
+            if (coordinator := self.coordinators.get(entry_id)) is None or (
+                state := (coordinator.data or {}).get(idx)
+            ) is None:
+                continue
+            before = self._sent.get(idx)
+            fields = {
+                field: getattr(state, field)
+                for field in STREAM_FIELDS
+                if before is None or getattr(before, field) != getattr(state, field)
+            }
+            self._sent[idx] = state
+            self._owner[idx] = entry_id
+            if fields:
+                changed[idx] = fields
+        if changed:
+            event["chargers"] = changed
+
+        if self._check_removed:
+            self._check_removed = False
+            if removed := [
+                idx
+                for idx, entry_id in self._owner.items()
+                if self._removed(idx, entry_id)
+            ]:
+                for idx in removed:
+                    del self._sent[idx], self._owner[idx]
+                event["removed"] = removed
+
+        if (available := self._availability()) != self._available:
+            self._available = available
+            event["available"] = available
+
+        if event:
+            self.connection.send_message(
+                websocket_api.event_message(self.msg_id, event)
+            )
+
+    def _removed(self, idx: str, entry_id: str) -> bool:
+        """Return whether a charger left its account, or its account is gone."""
+        if entry_id not in self.coordinators:
+            return True
+        coordinator = self.coordinators[entry_id]
+        # Unknown while the account isn't loaded
+        return coordinator is not None and idx not in (coordinator.data or {})
+
+    def _availability(self) -> dict[str, bool]:
+        """Return whether the last refresh of every account succeeded."""
+        return {
+            entry_id: coordinator is not None and coordinator.last_update_success
+            for entry_id, coordinator in self.coordinators.items()
+        }